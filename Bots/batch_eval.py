@@ -0,0 +1,144 @@
+"""
+Vectorised evaluation of many positions at once with NumPy.
+Each position is packed into 12 bitboards (one per piece type and colour), a batch is unpacked into a
+(positions, 768) array of bits and scored against a weight per piece per square in a single matrix product.
+Scores are in centipawns from white's point of view.
+"""
+
+import numpy as np
+import chess
+from Bots.evaluation import PIECE_VALUES
+
+# Piece-square tables from white's point of view, a1 first and h8 last
+PAWN_TABLE = [
+     0,   0,   0,   0,   0,   0,   0,   0,
+     5,  10,  10, -20, -20,  10,  10,   5,
+     5,  -5, -10,   0,   0, -10,  -5,   5,
+     0,   0,   0,  20,  20,   0,   0,   0,
+     5,   5,  10,  25,  25,  10,   5,   5,
+    10,  10,  20,  30,  30,  20,  10,  10,
+    50,  50,  50,  50,  50,  50,  50,  50,
+     0,   0,   0,   0,   0,   0,   0,   0,
+]
+KNIGHT_TABLE = [
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20,   0,   5,   5,   0, -20, -40,
+    -30,   5,  10,  15,  15,  10,   5, -30,
+    -30,   0,  15,  20,  20,  15,   0, -30,
+    -30,   5,  15,  20,  20,  15,   5, -30,
+    -30,   0,  10,  15,  15,  10,   0, -30,
+    -40, -20,   0,   0,   0,   0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50,
+]
+BISHOP_TABLE = [
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10,   5,   0,   0,   0,   0,   5, -10,
+    -10,  10,  10,  10,  10,  10,  10, -10,
+    -10,   0,  10,  10,  10,  10,   0, -10,
+    -10,   5,   5,  10,  10,   5,   5, -10,
+    -10,   0,   5,  10,  10,   5,   0, -10,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20,
+]
+ROOK_TABLE = [
+     0,   0,   0,   5,   5,   0,   0,   0,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+     5,  10,  10,  10,  10,  10,  10,   5,
+     0,   0,   0,   0,   0,   0,   0,   0,
+]
+QUEEN_TABLE = [
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+    -10,   0,   5,   0,   0,   0,   0, -10,
+    -10,   5,   5,   5,   5,   5,   0, -10,
+      0,   0,   5,   5,   5,   5,   0,  -5,
+     -5,   0,   5,   5,   5,   5,   0,  -5,
+    -10,   0,   5,   5,   5,   5,   0, -10,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+]
+KING_TABLE = [
+     20,  30,  10,   0,   0,  10,  30,  20,
+     20,  20,   0,   0,   0,   0,  20,  20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+]
+PIECE_SQUARE_TABLES = {
+    chess.PAWN: PAWN_TABLE,
+    chess.KNIGHT: KNIGHT_TABLE,
+    chess.BISHOP: BISHOP_TABLE,
+    chess.ROOK: ROOK_TABLE,
+    chess.QUEEN: QUEEN_TABLE,
+    chess.KING: KING_TABLE
+}
+
+def board_bitboards(board):
+    """
+    The 12 bitboards of a position, white pawn to king followed by black pawn to king.
+    """
+    white, black = board.occupied_co[chess.WHITE], board.occupied_co[chess.BLACK]
+    pieces = (board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings)
+    return tuple(mask & white for mask in pieces) + tuple(mask & black for mask in pieces)
+
+class BatchEvaluator:
+    """
+    Scores batches of positions with material (piece_values in pawns) and, if use_tables is set, the piece-square tables above.
+    """
+    def __init__(self, piece_values=PIECE_VALUES, use_tables=True):
+        self.material_weights = self.build_weights(piece_values, False)
+        self.weights = self.build_weights(piece_values, use_tables)
+
+    @staticmethod
+    def build_weights(piece_values, use_tables):
+        weights = np.zeros((12, 64), dtype=np.float32)
+        for piece_type in chess.PIECE_TYPES:
+            table = np.array(PIECE_SQUARE_TABLES[piece_type], dtype=np.float32) if use_tables else np.zeros(64, dtype=np.float32)
+            value = piece_values[piece_type] * 100
+            weights[piece_type - 1] = value + table
+            # black's tables are white's flipped vertically, i.e. square ^ 56
+            weights[piece_type + 5] = -(value + table.reshape(8, 8)[::-1].reshape(64))
+        return weights.reshape(768)
+
+    bitboards = staticmethod(board_bitboards)
+
+    @staticmethod
+    def pack(positions):
+        """
+        Packs a list of boards or bitboard tuples into a (positions, 12) uint64 array.
+        """
+        rows = [board_bitboards(p) if isinstance(p, chess.BaseBoard) else p for p in positions]
+        return np.array(rows, dtype=np.uint64).reshape(len(rows), 12)
+
+    @staticmethod
+    def unpack(bitboards):
+        """
+        Turns a (positions, 12) uint64 array into a (positions, 768) array of bits, index = piece * 64 + square.
+        """
+        as_bytes = np.ascontiguousarray(bitboards, dtype='<u8').view(np.uint8)
+        return np.unpackbits(as_bytes, axis=1, bitorder='little')
+
+    def evaluate(self, bitboards):
+        """
+        Material plus piece-square score of every position in centipawns, positive is good for white.
+        """
+        return self.unpack(bitboards) @ self.weights
+
+    def material(self, bitboards):
+        return self.unpack(bitboards) @ self.material_weights
+
+    def evaluate_boards(self, boards):
+        return self.evaluate(self.pack(boards))
+
+    @staticmethod
+    def group_min(scores, starts):
+        """
+        Minimum score of each group of consecutive positions, where starts holds the index each group begins at.
+        """
+        return np.minimum.reduceat(scores, starts)
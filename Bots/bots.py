@@ -11,31 +11,26 @@ def iterate_board(board):
 """
 
 import random
+import time
 import chess
-from PyQt5.QtWidgets import QInputDialog
-class HumanNotBot:
+from Bots.moves import decode_move, encode_move
+from Bots.search_board import SearchBoard
+from Bots.transposition import TranspositionTable, EXACT, LOWER, UPPER
+
+__all__ = ['SearchTimeout', 'HumanNotBot', 'RandomBot', 'BasicEvalBot', 'nMoveBasicEvalBot', 'AlphaBetaBot', 'BatchEvalBot']
+
+class SearchTimeout(Exception):
     """
-    "Bot" which allows humans to make moves.
+    Raised inside a search once the bot's deadline has passed.
     """
-    def __init__(self):
-        self.name = 'Me'
-        self.side = None
-        self.wins = 0
-        self.losses = 0
-        self.draws = 0
 
-    def get_move(self, board):
-        legal_moves = list(board.legal_moves)
-        moves_string = ''
-        san_moves = [board.san(m) for m in legal_moves]
-        for m in san_moves:
-            moves_string += f'{m}\n'
-        move, ok = QInputDialog.getText(None, "Enter Move", f"{moves_string}Enter your move:")
-        if ok:
-            move = board.parse_san(move)
-            if move in legal_moves:
-                return move
-        return None
+def __getattr__(name):
+    # HumanNotBot lives in Bots.human so headless runs don't have to load anything GUI related,
+    # it's imported from there the first time it's asked for here
+    if name == 'HumanNotBot':
+        from Bots.human import HumanNotBot
+        return HumanNotBot
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class RandomBot:
     """
@@ -48,8 +43,8 @@ class RandomBot:
         self.losses = 0
         self.draws = 0
 
-    def get_move(self, board):
-        move = random.choice(list(board.legal_moves))
+    def get_move(self, board, legal_moves=None):
+        move = random.choice(legal_moves or list(board.legal_moves))
         return move
 
 class BasicEvalBot:
@@ -74,31 +69,26 @@ class BasicEvalBot:
         }
 
     def evaluate(self, board):
-        white_sum = 0
-        black_sum = 0
-        for square in chess.SQUARES:
-            piece = board.piece_at(square)
-            if piece is not None:
-                value = self.piece_values[piece.piece_type]
-                if piece.color == chess.WHITE:
-                    white_sum += value
-                else:
-                    black_sum += value
-        
-        return white_sum, black_sum
+        """
+        Summed piece values of white and black. board is a SearchBoard, which keeps them up to date as moves are made.
+        """
+        return board.white_sum, board.black_sum
 
-    def get_move(self, board):
+    def get_move(self, board, legal_moves=None):
         """
         Needs to consider the move which causes the opponent's worst state as its best move rather than looking at the move
         which causes its best state because your moves can only capture the enemy pieces. The downside to this is that it really means
         that all it does is simply capture the most valuable piece if possible, otherwise it makes a random move.
+        Each move is made and unmade on a single SearchBoard rather than on a copy of the board.
         """
-        legal_moves = list(board.legal_moves)
+        if legal_moves is None:
+            legal_moves = list(board.legal_moves)
+        search_board = SearchBoard(board, self.piece_values)
         results = []
         for move in legal_moves:
-            temp_board = board.copy()
-            temp_board.push(move)
-            white_sum, black_sum = self.evaluate(temp_board) # evaluate moves
+            search_board.push(move)
+            white_sum, black_sum = self.evaluate(search_board) # evaluate moves
+            search_board.pop()
             result = {
                 "move": move,
                 "white_sum": white_sum,
@@ -125,12 +115,16 @@ class BasicEvalBot:
 class nMoveBasicEvalBot:
     """
     Bot which functions the same as the BasicEvalBot but this time looking n moves ahead.
-    Anything higher than 3 seems to take too long.
+    Anything higher than 3 seems to take too long, so when given a deadline it searches 1 move ahead, then 2 and so on
+    until foresight is reached or time runs out, returning the result of the deepest search which finished.
     """
     def __init__(self, foresight):
         self.name = f'{foresight}-Move B.E.B'
         self.foresight = foresight
         self.side = None
+        self.deadline = None
+        self.nodes = 0
+        self.depth_reached = 0
         self.wins = 0
         self.losses = 0
         self.draws = 0
@@ -144,35 +138,35 @@ class nMoveBasicEvalBot:
         }
 
     def evaluate(self, board):
-        white_sum = 0
-        black_sum = 0
-        for square in chess.SQUARES:
-            piece = board.piece_at(square)
-            if piece is not None:
-                value = self.piece_values[piece.piece_type]
-                if piece.color == chess.WHITE:
-                    white_sum += value
-                else:
-                    black_sum += value
-        
-        return white_sum, black_sum
+        """
+        Summed piece values of white and black. board is a SearchBoard, which keeps them up to date as moves are made.
+        """
+        return board.white_sum, board.black_sum
 
-    def explore_moves(self, board, current_depth=0):
+    def explore_moves(self, board, current_depth=0, foresight=None):
         """
         Explores each possible move, then tries each of those possible moves up to a depth of n and evalutes the board
-        at that state. 
+        at that state. board is a SearchBoard, moves are made and unmade on it rather than copying it.
         """
-        if current_depth == self.foresight:
+        if foresight is None:
+            foresight = self.foresight
+        self.nodes += 1
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise SearchTimeout()
+        if current_depth == foresight:
+            return self.evaluate(board)
+
+        legal_moves = board.legal_moves()
+        if not legal_moves: # game over
             return self.evaluate(board)
         
         total_white_sum = 0
         total_black_sum = 0
-        legal_moves = list(board.legal_moves)
         
         for move in legal_moves:
-            temp_board = board.copy()
-            temp_board.push(move)
-            white_sum, black_sum = self.explore_moves(temp_board, current_depth + 1)
+            board.make(move)
+            white_sum, black_sum = self.explore_moves(board, current_depth + 1, foresight)
+            board.unmake()
             total_white_sum += white_sum
             total_black_sum += black_sum
 
@@ -181,11 +175,41 @@ class nMoveBasicEvalBot:
 
         return avg_white_sum, avg_black_sum
 
-    def get_move(self, board):
-        legal_moves = list(board.legal_moves)
+    def get_move(self, board, legal_moves=None):
+        self.nodes = 0
+        self.depth_reached = 0
+        if self.deadline is None:
+            best_move = self.search(board, self.foresight, legal_moves)
+            self.depth_reached = self.foresight
+            return best_move
+
+        best_move = None
+        for foresight in range(1, self.foresight + 1):
+            try:
+                best_move = self.search(board, foresight, legal_moves)
+            except SearchTimeout:
+                break
+            self.depth_reached = foresight
+        if best_move is None: # not even the shallowest search finished
+            best_move = random.choice(legal_moves or list(board.legal_moves))
+        return best_move
+
+    def search_stats(self):
+        """
+        Counters for the last get_move call, see Runner.instrumentation.
+        """
+        return {'nodes': self.nodes, 'depth': self.depth_reached}
+
+    def search(self, board, foresight, legal_moves=None):
+        if legal_moves is None:
+            legal_moves = list(board.legal_moves)
+        # a timeout can leave moves made on the search board, so every search starts from a fresh one
+        search_board = SearchBoard(board, self.piece_values)
         results = []
         for move in legal_moves:
-            white_sum, black_sum = self.explore_moves(board)
+            search_board.push(move)
+            white_sum, black_sum = self.explore_moves(search_board, 1, foresight) # the candidate move counts as the first move
+            search_board.pop()
             result = {
                 "move": move,
                 "white_sum": white_sum,
@@ -208,3 +232,296 @@ class nMoveBasicEvalBot:
             best_move = random.choice(legal_moves) 
         
         return best_move
+
+class AlphaBetaBot:
+    """
+    Bot which searches depth moves ahead using negamax with alpha-beta pruning.
+    Unlike the nMoveBasicEvalBot it assumes the opponent replies with their best move rather than averaging over every reply,
+    which lets it skip any branch that can't change the result. Captures are searched first (most valuable victim, least valuable attacker)
+    so that cutoffs happen early, and moves are made and unmade on a single SearchBoard rather than copying a chess.Board at every node.
+    The SearchBoard keeps the material and the position's Zobrist key up to date as moves are made, so neither the leaves
+    nor the transposition table lookups need anything worked out from scratch.
+    Positions are cached in a transposition table of tt_memory bytes (set it to 0 to search without one).
+    The search deepens one move at a time, so when given a deadline it returns the best move of the deepest search
+    which finished in time. The transposition table makes the repeated shallower searches close to free.
+    Bots given the same shared_cache (a Bots.shared_cache.SharedPositionCache) share their results across processes,
+    a position already searched at least as deep by a bot with the same depth and piece values is answered straight from the cache.
+    """
+    MATE_SCORE = 100000
+    MATE_THRESHOLD = MATE_SCORE - 1000
+    TIME_CHECK_NODES = 64 # how often the deadline is checked, a few milliseconds of search at most
+    NEXT_DEPTH_FRACTION = 0.5 # another depth isn't started once this much of the time has been used, it would rarely finish
+
+    def __init__(self, depth=4, tt_memory=16 * 1024 * 1024, shared_cache=None):
+        self.name = f'{depth}-Ply Alpha-Beta'
+        self.depth = depth
+        self.side = None
+        self.deadline = None
+        self.wins = 0
+        self.losses = 0
+        self.draws = 0
+        self.nodes = 0
+        self.depth_reached = 0
+        self.tt_memory = tt_memory
+        self.tt = TranspositionTable(tt_memory, packed_moves=True) if tt_memory else None
+        self.tt_counts = (0, 0) # probes and hits of the table when the last search started
+        self.shared_cache = shared_cache
+        self.cache_hit = False # whether the last move came from the shared cache
+        self.piece_values = {
+        chess.PAWN: 1,
+        chess.KNIGHT: 3,
+        chess.BISHOP: 3,
+        chess.ROOK: 5,
+        chess.QUEEN: 9,
+        chess.KING: 0
+        }
+
+    def __getstate__(self):
+        # pickled and deep copied bots (e.g. by BotFactory for every game) get a new empty table
+        # rather than a copy of tt_memory bytes of entries from earlier searches
+        state = self.__dict__.copy()
+        state['tt'] = None
+        state['tt_counts'] = (0, 0)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.tt_memory:
+            self.tt = TranspositionTable(self.tt_memory, packed_moves=True)
+
+    def move_order_key(self, board, move):
+        """
+        Captures are sorted by most valuable victim, then least valuable attacker. Promotions come next, quiet moves last.
+        Moves are packed ints (see Bots.moves) on a SearchBoard.
+        """
+        if board.is_capture(move):
+            if board.is_en_passant(move):
+                victim = chess.PAWN
+            else:
+                victim = board.piece_type_at((move >> 6) & 63)
+            attacker = board.piece_type_at(move & 63)
+            return -(100 + self.piece_values[victim] * 10 - self.piece_values[attacker])
+        if move >> 12:
+            return -self.piece_values[move >> 12]
+        return 0
+
+    def ordered_moves(self, board, first_move=None):
+        moves = sorted(board.legal_moves(), key=lambda move: self.move_order_key(board, move))
+        # the best move from a previous search of this position goes first. Checking that it's legal also
+        # protects against another thread having overwritten the entry halfway through
+        if first_move in moves:
+            moves.remove(first_move)
+            moves.insert(0, first_move)
+        return moves
+
+    def score_to_tt(self, score, ply):
+        """
+        Mate scores are stored relative to the position rather than the root so they stay valid when reached at a different ply.
+        """
+        if score > self.MATE_THRESHOLD:
+            return score + ply
+        if score < -self.MATE_THRESHOLD:
+            return score - ply
+        return score
+
+    def score_from_tt(self, score, ply):
+        if score > self.MATE_THRESHOLD:
+            return score - ply
+        if score < -self.MATE_THRESHOLD:
+            return score + ply
+        return score
+
+    def negamax(self, board, depth, alpha, beta, ply=0):
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % self.TIME_CHECK_NODES == 0 and time.monotonic() > self.deadline:
+            raise SearchTimeout()
+        if depth == 0:
+            return board.relative_material()
+
+        tt_move = None
+        if self.tt is not None:
+            key = board.key
+            entry = self.tt.probe(key)
+            if entry is not None:
+                tt_depth, bound, tt_score, tt_move = entry
+                if tt_depth >= depth:
+                    tt_score = self.score_from_tt(tt_score, ply)
+                    if bound == EXACT:
+                        return max(alpha, min(tt_score, beta))
+                    if bound == LOWER and tt_score >= beta:
+                        return beta
+                    if bound == UPPER and tt_score <= alpha:
+                        return alpha
+
+        moves = self.ordered_moves(board, tt_move)
+        if not moves:
+            # checkmate (prefer the quickest mate) or stalemate
+            return -self.MATE_SCORE + ply if board.is_check() else 0
+
+        alpha_original = alpha
+        best_move = None
+        for move in moves:
+            board.make(move)
+            score = -self.negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            board.unmake()
+            if score >= beta:
+                if self.tt is not None:
+                    self.tt.store(key, depth, LOWER, self.score_to_tt(beta, ply), move)
+                return beta
+            if score > alpha:
+                alpha = score
+                best_move = move
+
+        if self.tt is not None:
+            bound = EXACT if alpha > alpha_original else UPPER
+            self.tt.store(key, depth, bound, self.score_to_tt(alpha, ply), best_move)
+        return alpha
+
+    def get_move(self, board, legal_moves=None):
+        start = time.monotonic()
+        board = SearchBoard(board, self.piece_values)
+        self.nodes = 0
+        self.depth_reached = 0
+        if self.tt is not None:
+            self.tt.new_search()
+            self.tt_counts = (self.tt.probes, self.tt.hits)
+
+        # shuffle first so moves which are ordered the same get picked at random
+        moves = [encode_move(move) for move in legal_moves] if legal_moves else board.legal_moves()
+        random.shuffle(moves)
+        moves.sort(key=lambda move: self.move_order_key(board, move))
+
+        self.cache_hit = False
+        if self.shared_cache is not None:
+            cache_key = board.key ^ self.cache_config_key()
+            entry = self.shared_cache.probe(cache_key)
+            # the move is checked against the legal moves in case of a key collision
+            if entry is not None and entry[0] >= self.depth and entry[2] in moves:
+                self.cache_hit = True
+                self.depth_reached = entry[0]
+                return decode_move(entry[2])
+
+        best_move, score = moves[0], None
+        for depth in range(1, self.depth + 1):
+            if depth > 1 and self.deadline is not None:
+                # each depth takes several times longer than the last, so don't start one which is bound to be cut off
+                now = time.monotonic()
+                if now - start >= (self.deadline - start) * self.NEXT_DEPTH_FRACTION:
+                    break
+            try:
+                best_move, score = self.search_root(board, moves, depth)
+            except SearchTimeout:
+                break
+            self.depth_reached = depth
+            # search the previous best move first on the next iteration
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+        if self.shared_cache is not None and score is not None:
+            self.shared_cache.store(cache_key, self.depth_reached, score, best_move)
+        return decode_move(best_move)
+
+    def cache_config_key(self):
+        """
+        Fingerprint of the settings which change what this bot plays, mixed into its shared cache keys
+        so it never plays a move stored by a bot searching deeper or valuing pieces differently.
+        """
+        from Bots.shared_cache import config_key
+        return config_key(type(self).__qualname__, self.depth, sorted(self.piece_values.items()))
+
+    def search_stats(self):
+        """
+        Counters for the last get_move call, see Runner.instrumentation.
+        """
+        stats = {'nodes': self.nodes, 'depth': self.depth_reached}
+        if self.tt is not None:
+            stats['tt_probes'] = self.tt.probes - self.tt_counts[0]
+            stats['tt_hits'] = self.tt.hits - self.tt_counts[1]
+        if self.shared_cache is not None:
+            stats['cache_hits'] = int(self.cache_hit)
+        return stats
+
+    def search_root(self, board, moves, depth):
+        best_move = moves[0]
+        alpha, beta = -self.MATE_SCORE - 1, self.MATE_SCORE + 1
+        for move in moves:
+            # on a timeout the moves made below here are never unmade, that's fine since the board gets thrown away
+            board.make(move)
+            score = -self.negamax(board, depth - 1, -beta, -alpha, 1)
+            board.unmake()
+            if score > alpha:
+                alpha = score
+                best_move = move
+        return best_move, alpha
+
+class BatchEvalBot:
+    """
+    Bot which, like the BasicEvalBot, scores the position after each of its legal moves, but scores all of them at once
+    in a single vectorised NumPy call. It also uses piece-square tables, so when nothing can be captured it develops
+    its pieces rather than moving randomly.
+    With depth=2 it also looks at every reply and assumes the opponent picks the one which is worst for it,
+    still scoring every resulting position in one call. Replies which checkmate it score MATE_SCORE below anything else. Requires NumPy.
+    """
+    MATE_SCORE = 1000000 # centipawns
+
+    def __init__(self, depth=1):
+        from Bots.batch_eval import BatchEvaluator # imported here so NumPy is only needed when this bot is used
+        if depth not in (1, 2):
+            raise ValueError('BatchEvalBot only supports a depth of 1 or 2')
+        self.name = f'{depth}-Move Batch B.E.B'
+        self.depth = depth
+        self.side = None
+        self.wins = 0
+        self.losses = 0
+        self.draws = 0
+        self.evaluator = BatchEvaluator()
+
+    def get_move(self, board, legal_moves=None):
+        board = board.copy(stack=False)
+        sign = 1 if board.turn == chess.WHITE else -1
+
+        # shuffle first so that equally scored moves get picked at random
+        moves = list(legal_moves or board.legal_moves)
+        random.shuffle(moves)
+        if self.depth == 1:
+            positions = []
+            for move in moves:
+                board.push(move)
+                positions.append(self.evaluator.bitboards(board))
+                board.pop()
+            scores = sign * self.evaluator.evaluate(self.evaluator.pack(positions))
+            return moves[int(scores.argmax())]
+
+        positions = []
+        starts = [] # index of each candidate's first reply in positions
+        candidates = []
+        stalemates = []
+        mated = [] # index in positions of every reply which checkmates this bot
+        for move in moves:
+            board.push(move)
+            replies = list(board.legal_moves)
+            if not replies:
+                if board.is_check(): # checkmate
+                    return move
+                stalemates.append(move)
+            else:
+                starts.append(len(positions))
+                candidates.append(move)
+                for reply in replies:
+                    board.push(reply)
+                    # only positions in check can be mate, which keeps the extra move generation rare
+                    if board.is_check() and not any(board.generate_legal_moves()):
+                        mated.append(len(positions))
+                    positions.append(self.evaluator.bitboards(board))
+                    board.pop()
+            board.pop()
+
+        if not candidates:
+            return stalemates[0]
+        scores = sign * self.evaluator.evaluate(self.evaluator.pack(positions))
+        scores[mated] = -self.MATE_SCORE
+        worst_case = self.evaluator.group_min(scores, starts)
+        best = int(worst_case.argmax())
+        # a stalemate scores 0, take it over a line which loses material
+        if stalemates and worst_case[best] < 0:
+            return stalemates[0]
+        return candidates[best]
@@ -0,0 +1,28 @@
+"""
+Material evaluation shared by the bots.
+Rather than looking at each of the 64 squares, material is counted straight from python-chess's bitboards.
+During a search SearchBoard keeps a running total instead, so scoring a position costs nothing.
+"""
+
+import chess
+
+PIECE_VALUES = {
+    chess.PAWN: 1,
+    chess.KNIGHT: 3,
+    chess.BISHOP: 3,
+    chess.ROOK: 5,
+    chess.QUEEN: 9,
+    chess.KING: 0
+}
+
+def material(board, piece_values=PIECE_VALUES):
+    """
+    Returns the summed piece values of white and black, using one popcount per piece type and colour.
+    """
+    white_sum = 0
+    black_sum = 0
+    for piece_type, value in piece_values.items():
+        if value:
+            white_sum += value * chess.popcount(board.pieces_mask(piece_type, chess.WHITE))
+            black_sum += value * chess.popcount(board.pieces_mask(piece_type, chess.BLACK))
+    return white_sum, black_sum
@@ -0,0 +1,32 @@
+"""
+Bots which need the GUI. Kept out of Bots.bots so that headless runs and worker processes never import anything Qt related.
+"""
+
+class HumanNotBot:
+    """
+    "Bot" which allows humans to make moves.
+    """
+    runs_on_gui_thread = True # opens a dialog so can't be run on the background move thread
+
+    def __init__(self):
+        self.name = 'Me'
+        self.side = None
+        self.wins = 0
+        self.losses = 0
+        self.draws = 0
+
+    def get_move(self, board, legal_moves=None):
+        from PyQt5.QtWidgets import QInputDialog # imported here so headless runs never load Qt
+        if legal_moves is None:
+            legal_moves = list(board.legal_moves)
+        moves_string = ''
+        san_moves = [board.san(m) for m in legal_moves]
+        for m in san_moves:
+            moves_string += f'{m}\n'
+        move, ok = QInputDialog.getText(None, "Enter Move", f"{moves_string}Enter your move:")
+        if ok:
+            try:
+                return board.parse_san(move) # only parses legal moves
+            except ValueError:
+                pass
+        return None
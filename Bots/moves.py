@@ -0,0 +1,13 @@
+"""
+Packs moves into 16 bits: from square (6 bits), to square (6 bits) and promotion piece type (4 bits).
+Used wherever moves need to be stored compactly, e.g. the transposition table.
+"""
+
+import chess
+
+def encode_move(move):
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+def decode_move(code):
+    promotion = code >> 12
+    return chess.Move(code & 63, (code >> 6) & 63, promotion or None)
@@ -0,0 +1,53 @@
+"""
+Tiny UCI engine which plays random legal moves. Stands in for a real engine when trying out Bots.uci.UciBot:
+
+    UciBot([sys.executable, 'Bots/random_engine.py'])
+
+Only understands the commands UciBot sends (uci, isready, setoption, ucinewgame, position, go, stop and quit).
+"""
+
+import random
+import sys
+import chess
+
+def parse_position(tokens):
+    """
+    Builds the board for 'position startpos moves e2e4 ...' or 'position fen <fen> moves ...'.
+    """
+    if 'moves' in tokens:
+        split = tokens.index('moves')
+        tokens, moves = tokens[:split], tokens[split + 1:]
+    else:
+        moves = []
+    board = chess.Board(' '.join(tokens[1:])) if tokens[0] == 'fen' else chess.Board()
+    for move in moves:
+        board.push_uci(move)
+    return board
+
+def main():
+    board = chess.Board()
+    for line in sys.stdin:
+        tokens = line.split()
+        if not tokens:
+            continue
+        command = tokens[0]
+        if command == 'uci':
+            print('id name Random Engine')
+            print('id author chessBots')
+            print('uciok')
+        elif command == 'isready':
+            print('readyok')
+        elif command == 'ucinewgame':
+            board = chess.Board()
+        elif command == 'position':
+            board = parse_position(tokens[1:])
+        elif command == 'go':
+            moves = list(board.legal_moves)
+            print(f'info depth 1 nodes {len(moves)}')
+            print(f'bestmove {random.choice(moves).uci()}' if moves else 'bestmove 0000')
+        elif command == 'quit':
+            break
+        sys.stdout.flush()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Registry of bots by name, so a bot's module is only imported once that bot is actually picked.
+Bots are registered as 'module:Class' strings, the same format used by entry points, which means
+headless runs and worker processes never import modules for bots they don't play (like the GUI only HumanNotBot).
+
+Other packages can add bots by declaring an entry point in the 'chessbots.bots' group, e.g. in their pyproject.toml:
+
+    [project.entry-points."chessbots.bots"]
+    MyBot = "my_package.bots:MyBot"
+
+after which 'MyBot' can be used anywhere a bot name is taken, such as simulate.py.
+"""
+
+import importlib
+
+ENTRY_POINT_GROUP = 'chessbots.bots'
+
+BOTS = {
+    'RandomBot': 'Bots.bots:RandomBot',
+    'BasicEvalBot': 'Bots.bots:BasicEvalBot',
+    'nMoveBasicEvalBot': 'Bots.bots:nMoveBasicEvalBot',
+    'AlphaBetaBot': 'Bots.bots:AlphaBetaBot',
+    'BatchEvalBot': 'Bots.bots:BatchEvalBot',
+    'UciBot': 'Bots.uci:UciBot',
+    'HumanNotBot': 'Bots.human:HumanNotBot',
+}
+GUI_BOTS = {'HumanNotBot'} # need a running QApplication, can't be played headless
+
+_loaded = {}
+_discovered = False
+
+def _entry_points():
+    from importlib.metadata import entry_points
+    points = entry_points()
+    if hasattr(points, 'select'):
+        return points.select(group=ENTRY_POINT_GROUP)
+    return points.get(ENTRY_POINT_GROUP, []) # python < 3.10 returns a dict
+
+def discover():
+    """
+    Adds bots declared by installed packages under the 'chessbots.bots' entry point group.
+    Only reads package metadata, none of the bot modules are imported. Built in names are never overridden.
+    """
+    global _discovered
+    if _discovered:
+        return
+    _discovered = True
+    for point in _entry_points():
+        BOTS.setdefault(point.name, point.value)
+
+def register(name, target, gui=False):
+    """
+    Registers a bot under name. target is either a 'module:Class' string, imported the first time the bot is loaded, or the class itself.
+    """
+    if isinstance(target, str):
+        _loaded.pop(name, None)
+    else:
+        _loaded[name] = target
+        target = f'{target.__module__}:{target.__qualname__}'
+    BOTS[name] = target
+    if gui:
+        GUI_BOTS.add(name)
+    else:
+        GUI_BOTS.discard(name)
+
+def available_bots():
+    """
+    Returns the names of every registered bot, including ones from entry points.
+    """
+    discover()
+    return sorted(BOTS)
+
+def is_gui_bot(name):
+    return name in GUI_BOTS
+
+def _import_target(target):
+    module_name, _, attribute = target.partition(':')
+    value = importlib.import_module(module_name)
+    for part in attribute.split('.'):
+        value = getattr(value, part)
+    return value
+
+def load_bot(name):
+    """
+    Returns the bot class registered under name, importing its module if needed.
+    Names which aren't registered can also be given directly as 'module:Class'.
+    """
+    if name in _loaded:
+        return _loaded[name]
+    if name not in BOTS:
+        discover()
+    target = BOTS.get(name)
+    if target is None:
+        if ':' not in name:
+            raise ValueError(f'Unknown bot: {name} (available: {", ".join(available_bots())})')
+        target = name
+    try:
+        bot_class = _import_target(target)
+    except (ImportError, AttributeError) as e:
+        raise ValueError(f'Could not load bot {name} from {target}: {e}') from e
+    if not isinstance(bot_class, type) or not hasattr(bot_class, 'get_move'):
+        raise ValueError(f'{target} is not a bot')
+    _loaded[name] = bot_class
+    return bot_class
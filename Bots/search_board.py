@@ -0,0 +1,489 @@
+"""
+Compact board for searching, kept separate from chess.Board which copies its whole move stack and
+allocates a Python object per move. Pieces are 12 bitboards plus a 64 square mailbox, moves are the 16 bit ints
+from Bots.moves, and make/unmake update everything in place (one undo tuple per move) including the polyglot
+Zobrist key and the material count, so neither has to be recomputed at every node.
+Boards are converted from and to chess.Board at the get_move boundary, standard chess only.
+"""
+
+import chess
+import chess.polyglot
+from Bots.evaluation import PIECE_VALUES, material
+from Bots.moves import decode_move, encode_move
+
+WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE = 1, 2, 4, 8
+# castling rights lost when a move starts or ends on a square
+CASTLING_LOSS = [0] * 64
+CASTLING_LOSS[chess.E1] = WHITE_KINGSIDE | WHITE_QUEENSIDE
+CASTLING_LOSS[chess.H1] = WHITE_KINGSIDE
+CASTLING_LOSS[chess.A1] = WHITE_QUEENSIDE
+CASTLING_LOSS[chess.E8] = BLACK_KINGSIDE | BLACK_QUEENSIDE
+CASTLING_LOSS[chess.H8] = BLACK_KINGSIDE
+CASTLING_LOSS[chess.A8] = BLACK_QUEENSIDE
+
+RANDOM = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+CASTLING_KEYS = [0] * 16
+for rights in range(16):
+    for bit in range(4):
+        if rights & (1 << bit):
+            CASTLING_KEYS[rights] ^= RANDOM[768 + bit]
+TURN_KEY = RANDOM[780]
+
+BETWEEN = [[chess.between(a, b) for b in chess.SQUARES] for a in chess.SQUARES]
+NOT_FILE_A = chess.BB_ALL & ~chess.BB_FILE_A
+NOT_FILE_H = chess.BB_ALL & ~chess.BB_FILE_H
+PROMOTIONS = [chess.QUEEN, chess.ROOK, chess.BISHOP, chess.KNIGHT]
+EMPTY = -1
+
+KNIGHT_ATTACKS = chess.BB_KNIGHT_ATTACKS
+KING_ATTACKS = chess.BB_KING_ATTACKS
+PAWN_ATTACKS = chess.BB_PAWN_ATTACKS
+DIAG_MASKS, DIAG_ATTACKS = chess.BB_DIAG_MASKS, chess.BB_DIAG_ATTACKS
+FILE_MASKS, FILE_ATTACKS = chess.BB_FILE_MASKS, chess.BB_FILE_ATTACKS
+RANK_MASKS, RANK_ATTACKS = chess.BB_RANK_MASKS, chess.BB_RANK_ATTACKS
+RAYS = chess.BB_RAYS
+SQUARE_BB = chess.BB_SQUARES
+lsb = chess.lsb
+scan = chess.scan_reversed
+
+def piece_index(piece_type, color):
+    """
+    Pieces are numbered the same way polyglot numbers them: black pawn 0, white pawn 1, black knight 2 ...
+    """
+    return (piece_type - 1) * 2 + color
+
+def ep_key(ep_square, turn, pawns):
+    """
+    Polyglot only hashes the en passant file when a pawn of the side to move is next to the pawn which can be taken.
+    """
+    if ep_square is None:
+        return 0
+    pawn = SQUARE_BB[ep_square - 8 if turn else ep_square + 8]
+    if (((pawn << 1) & NOT_FILE_A) | ((pawn >> 1) & NOT_FILE_H)) & pawns:
+        return RANDOM[772 + (ep_square & 7)]
+    return 0
+
+class SearchBoard:
+    """
+    Array backed board for searching with make/unmake. Moves are ints packed by Bots.moves.encode_move.
+    piece_values are the values material is counted with (white_sum and black_sum are kept up to date).
+    Has pieces_mask, turn and piece_type_at like chess.Board so material() and similar helpers work on it unchanged.
+    """
+    __slots__ = ('pieces', 'occupied_co', 'occupied', 'squares', 'turn', 'castling', 'ep_square', 'ep_key', 'halfmove_clock',
+                 'fullmove_number', 'key', 'values', 'white_sum', 'black_sum', 'history')
+
+    def __init__(self, board=None, piece_values=PIECE_VALUES):
+        self.pieces = [0] * 12
+        self.occupied_co = [0, 0]
+        self.squares = [EMPTY] * 64
+        self.values = [piece_values[(index >> 1) + 1] for index in range(12)]
+        self.history = []
+        board = board if board is not None else chess.Board()
+        for square, piece in board.piece_map().items():
+            index = piece_index(piece.piece_type, piece.color)
+            self.pieces[index] |= SQUARE_BB[square]
+            self.occupied_co[piece.color] |= SQUARE_BB[square]
+            self.squares[square] = index
+        self.occupied = self.occupied_co[0] | self.occupied_co[1]
+        self.turn = board.turn
+        self.castling = ((WHITE_KINGSIDE if board.has_kingside_castling_rights(chess.WHITE) else 0) |
+                         (WHITE_QUEENSIDE if board.has_queenside_castling_rights(chess.WHITE) else 0) |
+                         (BLACK_KINGSIDE if board.has_kingside_castling_rights(chess.BLACK) else 0) |
+                         (BLACK_QUEENSIDE if board.has_queenside_castling_rights(chess.BLACK) else 0))
+        self.ep_square = board.ep_square
+        self.halfmove_clock = board.halfmove_clock
+        self.fullmove_number = board.fullmove_number
+
+        self.ep_key = ep_key(self.ep_square, self.turn, self.pieces[piece_index(chess.PAWN, self.turn)])
+        self.key = CASTLING_KEYS[self.castling] ^ self.ep_key ^ (TURN_KEY if self.turn else 0)
+        self.white_sum = self.black_sum = 0
+        for square, index in enumerate(self.squares):
+            if index != EMPTY:
+                self.key ^= RANDOM[64 * index + square]
+                if index & 1:
+                    self.white_sum += self.values[index]
+                else:
+                    self.black_sum += self.values[index]
+
+    def pieces_mask(self, piece_type, color):
+        return self.pieces[piece_index(piece_type, color)]
+
+    def piece_type_at(self, square):
+        index = self.squares[square]
+        return None if index == EMPTY else (index >> 1) + 1
+
+    def fen(self):
+        rows = []
+        for rank in range(7, -1, -1):
+            row = ''
+            empty = 0
+            for file in range(8):
+                index = self.squares[rank * 8 + file]
+                if index == EMPTY:
+                    empty += 1
+                    continue
+                if empty:
+                    row += str(empty)
+                    empty = 0
+                row += chess.piece_symbol((index >> 1) + 1).upper() if index & 1 else chess.piece_symbol((index >> 1) + 1)
+            rows.append(row + (str(empty) if empty else ''))
+        castling = ''.join(symbol for bit, symbol in zip((1, 2, 4, 8), 'KQkq') if self.castling & bit) or '-'
+        # like python-chess the en passant square is only written when the capture is legal
+        ep_square = '-'
+        if self.ep_key and any(self.is_en_passant(move) for move in self.legal_moves()):
+            ep_square = chess.square_name(self.ep_square)
+        return f"{'/'.join(rows)} {'w' if self.turn else 'b'} {castling} {ep_square} {self.halfmove_clock} {self.fullmove_number}"
+
+    def to_board(self):
+        return chess.Board(self.fen())
+
+    def relative_material(self):
+        """
+        Material balance from the point of view of the side to move.
+        """
+        score = self.white_sum - self.black_sum
+        return score if self.turn else -score
+
+    def attackers(self, square, color):
+        """
+        Bitboard of the pieces of color which attack square.
+        """
+        pieces = self.pieces
+        occupied = self.occupied
+        queens = pieces[8 + color]
+        return ((KNIGHT_ATTACKS[square] & pieces[2 + color]) |
+                (KING_ATTACKS[square] & pieces[10 + color]) |
+                (PAWN_ATTACKS[not color][square] & pieces[color]) |
+                ((RANK_ATTACKS[square][RANK_MASKS[square] & occupied] | FILE_ATTACKS[square][FILE_MASKS[square] & occupied]) &
+                 (pieces[6 + color] | queens)) |
+                (DIAG_ATTACKS[square][DIAG_MASKS[square] & occupied] & (pieces[4 + color] | queens)))
+
+    def is_attacked(self, square, color):
+        return bool(self.attackers(square, color))
+
+    def king_square(self, color):
+        return lsb(self.pieces[10 + color])
+
+    def is_check(self):
+        return self.is_attacked(self.king_square(self.turn), not self.turn)
+
+    def is_capture(self, move):
+        to_square = (move >> 6) & 63
+        if self.squares[to_square] != EMPTY:
+            return True
+        return to_square == self.ep_square and self.squares[move & 63] >> 1 == 0
+
+    def is_en_passant(self, move):
+        to_square = (move >> 6) & 63
+        return to_square == self.ep_square and self.squares[move & 63] >> 1 == 0 and self.squares[to_square] == EMPTY
+
+    def pinned(self, king, color):
+        """
+        Bitboard of the pieces of color which can't leave the line between their king and an enemy slider.
+        """
+        pieces = self.pieces
+        enemy = not color
+        queens = pieces[8 + enemy]
+        snipers = ((RANK_ATTACKS[king][0] | FILE_ATTACKS[king][0]) & (pieces[6 + enemy] | queens) |
+                   DIAG_ATTACKS[king][0] & (pieces[4 + enemy] | queens))
+        pinned = 0
+        own = self.occupied_co[color]
+        for sniper in scan(snipers):
+            blockers = BETWEEN[king][sniper] & self.occupied
+            if blockers and not blockers & (blockers - 1) and blockers & own:
+                pinned |= blockers
+        return pinned
+
+    def pseudo_legal_moves(self):
+        """
+        Moves which follow the piece movement rules but may leave the king in check. Castling is only generated when
+        the king doesn't pass through or stand on an attacked square.
+        """
+        us = self.turn
+        them = not us
+        pieces = self.pieces
+        own = self.occupied_co[us]
+        enemy = self.occupied_co[them]
+        occupied = self.occupied
+        moves = []
+        append = moves.append
+
+        # pawns
+        forward = 8 if us else -8
+        last_rank = chess.BB_RANK_8 if us else chess.BB_RANK_1
+        start_rank = chess.BB_RANK_2 if us else chess.BB_RANK_7
+        ep_bb = SQUARE_BB[self.ep_square] if self.ep_square is not None else 0
+        for square in scan(pieces[us]):
+            targets = PAWN_ATTACKS[us][square] & (enemy | ep_bb)
+            one = square + forward
+            if not occupied & SQUARE_BB[one]:
+                targets |= SQUARE_BB[one]
+                if SQUARE_BB[square] & start_rank and not occupied & SQUARE_BB[one + forward]:
+                    targets |= SQUARE_BB[one + forward]
+            for target in scan(targets):
+                if SQUARE_BB[target] & last_rank:
+                    for promotion in PROMOTIONS:
+                        append(square | (target << 6) | (promotion << 12))
+                else:
+                    append(square | (target << 6))
+
+        not_own = ~own
+        for square in scan(pieces[2 + us]):
+            for target in scan(KNIGHT_ATTACKS[square] & not_own):
+                append(square | (target << 6))
+        queens = pieces[8 + us]
+        for square in scan(pieces[4 + us] | queens):
+            for target in scan(DIAG_ATTACKS[square][DIAG_MASKS[square] & occupied] & not_own):
+                append(square | (target << 6))
+        for square in scan(pieces[6 + us] | queens):
+            attacks = RANK_ATTACKS[square][RANK_MASKS[square] & occupied] | FILE_ATTACKS[square][FILE_MASKS[square] & occupied]
+            for target in scan(attacks & not_own):
+                append(square | (target << 6))
+        king = lsb(pieces[10 + us])
+        for target in scan(KING_ATTACKS[king] & not_own):
+            append(king | (target << 6))
+
+        # castling
+        if self.castling:
+            kingside, queenside = (WHITE_KINGSIDE, WHITE_QUEENSIDE) if us else (BLACK_KINGSIDE, BLACK_QUEENSIDE)
+            if self.castling & (kingside | queenside) and not self.is_attacked(king, them):
+                if (self.castling & kingside and not occupied & (SQUARE_BB[king + 1] | SQUARE_BB[king + 2])
+                        and not self.is_attacked(king + 1, them) and not self.is_attacked(king + 2, them)):
+                    append(king | ((king + 2) << 6))
+                if (self.castling & queenside and not occupied & (SQUARE_BB[king - 1] | SQUARE_BB[king - 2] | SQUARE_BB[king - 3])
+                        and not self.is_attacked(king - 1, them) and not self.is_attacked(king - 2, them)):
+                    append(king | ((king - 2) << 6))
+        return moves
+
+    def legal_moves(self):
+        """
+        List of the legal moves. Outside of check only moves of the king, pinned pieces and en passant captures need a closer look.
+        """
+        us = self.turn
+        king = lsb(self.pieces[10 + us])
+        moves = self.pseudo_legal_moves()
+        if self.attackers(king, not us):
+            return [move for move in moves if self.is_safe(move)]
+
+        pinned = self.pinned(king, us)
+        squares = self.squares
+        ep_square = self.ep_square
+        legal = []
+        for move in moves:
+            from_square = move & 63
+            to_square = (move >> 6) & 63
+            if from_square == king:
+                # castling was already checked when it was generated
+                if abs(to_square - from_square) != 2 and self.attackers(to_square, not us):
+                    continue
+            elif to_square == ep_square and squares[from_square] >> 1 == 0:
+                if not self.is_safe(move):
+                    continue
+            elif SQUARE_BB[from_square] & pinned and not RAYS[king][from_square] & SQUARE_BB[to_square]:
+                continue
+            legal.append(move)
+        return legal
+
+    def is_safe(self, move):
+        """
+        Whether the move leaves the mover's king out of check, found by making it.
+        """
+        us = self.turn
+        self.make(move)
+        safe = not self.attackers(lsb(self.pieces[10 + us]), not us)
+        self.unmake()
+        return safe
+
+    def make(self, move):
+        from_square = move & 63
+        to_square = (move >> 6) & 63
+        promotion = move >> 12
+        us = self.turn
+        them = not us
+        pieces = self.pieces
+        squares = self.squares
+        occupied_co = self.occupied_co
+        from_bb = SQUARE_BB[from_square]
+        to_bb = SQUARE_BB[to_square]
+
+        piece = squares[from_square]
+        captured = squares[to_square]
+        capture_square = to_square
+        if piece >> 1 == 0 and to_square == self.ep_square and captured == EMPTY:
+            capture_square = to_square - 8 if us else to_square + 8
+            captured = squares[capture_square]
+        self.history.append((move, piece, captured, capture_square, self.castling, self.ep_square, self.ep_key, self.halfmove_clock,
+                             self.key, self.white_sum, self.black_sum))
+
+        key = self.key ^ self.ep_key ^ CASTLING_KEYS[self.castling] ^ TURN_KEY
+        if captured != EMPTY:
+            capture_bb = SQUARE_BB[capture_square]
+            pieces[captured] ^= capture_bb
+            occupied_co[them] ^= capture_bb
+            squares[capture_square] = EMPTY
+            key ^= RANDOM[64 * captured + capture_square]
+            if us:
+                self.black_sum -= self.values[captured]
+            else:
+                self.white_sum -= self.values[captured]
+
+        placed = piece_index(promotion, us) if promotion else piece
+        pieces[piece] ^= from_bb
+        pieces[placed] ^= to_bb
+        occupied_co[us] ^= from_bb | to_bb
+        squares[from_square] = EMPTY
+        squares[to_square] = placed
+        key ^= RANDOM[64 * piece + from_square] ^ RANDOM[64 * placed + to_square]
+        if promotion:
+            gain = self.values[placed] - self.values[piece]
+            if us:
+                self.white_sum += gain
+            else:
+                self.black_sum += gain
+
+        if piece >> 1 == 5 and abs(to_square - from_square) == 2: # castling, move the rook too
+            rook_from, rook_to = (from_square + 3, from_square + 1) if to_square > from_square else (from_square - 4, from_square - 1)
+            rook = squares[rook_from]
+            rook_bb = SQUARE_BB[rook_from] | SQUARE_BB[rook_to]
+            pieces[rook] ^= rook_bb
+            occupied_co[us] ^= rook_bb
+            squares[rook_from] = EMPTY
+            squares[rook_to] = rook
+            key ^= RANDOM[64 * rook + rook_from] ^ RANDOM[64 * rook + rook_to]
+
+        self.occupied = occupied_co[0] | occupied_co[1]
+        self.castling &= ~(CASTLING_LOSS[from_square] | CASTLING_LOSS[to_square])
+        if piece >> 1 == 0 and abs(to_square - from_square) == 16:
+            self.ep_square = (from_square + to_square) >> 1
+            self.ep_key = ep_key(self.ep_square, them, pieces[them])
+        else:
+            self.ep_square = None
+            self.ep_key = 0
+        if piece >> 1 == 0 or captured != EMPTY:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if not us:
+            self.fullmove_number += 1
+        self.turn = them
+        self.key = key ^ CASTLING_KEYS[self.castling] ^ self.ep_key
+
+    def unmake(self):
+        move, piece, captured, capture_square, self.castling, self.ep_square, self.ep_key, self.halfmove_clock, \
+            self.key, self.white_sum, self.black_sum = self.history.pop()
+        from_square = move & 63
+        to_square = (move >> 6) & 63
+        us = not self.turn
+        self.turn = us
+        if not us:
+            self.fullmove_number -= 1
+        pieces = self.pieces
+        squares = self.squares
+        occupied_co = self.occupied_co
+
+        placed = squares[to_square]
+        pieces[placed] ^= SQUARE_BB[to_square]
+        pieces[piece] ^= SQUARE_BB[from_square]
+        occupied_co[us] ^= SQUARE_BB[from_square] | SQUARE_BB[to_square]
+        squares[to_square] = EMPTY
+        squares[from_square] = piece
+
+        if captured != EMPTY:
+            pieces[captured] |= SQUARE_BB[capture_square]
+            occupied_co[not us] |= SQUARE_BB[capture_square]
+            squares[capture_square] = captured
+
+        if piece >> 1 == 5 and abs(to_square - from_square) == 2:
+            rook_from, rook_to = (from_square + 3, from_square + 1) if to_square > from_square else (from_square - 4, from_square - 1)
+            rook = squares[rook_to]
+            rook_bb = SQUARE_BB[rook_from] | SQUARE_BB[rook_to]
+            pieces[rook] ^= rook_bb
+            occupied_co[us] ^= rook_bb
+            squares[rook_to] = EMPTY
+            squares[rook_from] = rook
+        self.occupied = occupied_co[0] | occupied_co[1]
+
+    def push(self, move):
+        """
+        Makes a chess.Move, for code which works with python-chess moves.
+        """
+        self.make(encode_move(move))
+
+    def pop(self):
+        move = self.history[-1][0]
+        self.unmake()
+        return decode_move(move)
+
+def perft(board, depth):
+    """
+    Counts the leaf nodes of the move tree to the given depth, for checking move generation against known totals.
+    """
+    moves = board.legal_moves()
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        board.make(move)
+        nodes += perft(board, depth - 1)
+        board.unmake()
+    return nodes
+
+# (fen, known leaf counts at depth 1, 2, 3), from the chessprogramming wiki's perft results page
+PERFT_POSITIONS = [
+    (chess.STARTING_FEN, [20, 400, 8902]),
+    ('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1', [48, 2039, 97862]),
+    ('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1', [14, 191, 2812]),
+    ('r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1', [6, 264, 9467]),
+    ('rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8', [44, 1486, 62379]),
+    ('r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10', [46, 2079, 89890]),
+]
+
+def check_random_games(games, seed=0):
+    """
+    Plays random games on a SearchBoard and a chess.Board side by side and returns the first difference
+    in legal moves, Zobrist key, FEN or material as a string, or None if they always agreed.
+    """
+    import random
+    rng = random.Random(seed)
+    for game in range(games):
+        board = chess.Board()
+        search_board = SearchBoard(board)
+        plies = 0
+        while not board.is_game_over(claim_draw=True):
+            expected = sorted(move.uci() for move in board.legal_moves)
+            moves = sorted(decode_move(move).uci() for move in search_board.legal_moves())
+            if moves != expected:
+                return f'game {game} ply {plies} {board.fen()}: legal moves {moves} != {expected}'
+            if search_board.key != chess.polyglot.zobrist_hash(board):
+                return f'game {game} ply {plies} {board.fen()}: Zobrist key differs'
+            if search_board.fen() != board.fen():
+                return f'game {game} ply {plies}: FEN {search_board.fen()} != {board.fen()}'
+            if (search_board.white_sum, search_board.black_sum) != material(board):
+                return f'game {game} ply {plies} {board.fen()}: material differs'
+            move = rng.choice(list(board.legal_moves))
+            board.push(move)
+            search_board.push(move)
+            plies += 1
+        # unwinding must give back the starting position
+        while plies:
+            search_board.pop()
+            plies -= 1
+        if search_board.fen() != chess.STARTING_FEN or search_board.key != chess.polyglot.zobrist_hash(chess.Board()):
+            return f'game {game}: unmaking every move did not get back to the starting position'
+    return None
+
+if __name__ == '__main__':
+    # python -m Bots.search_board [GAMES] checks the move generator against known perft counts and python-chess
+    import sys
+    import time
+    failed = False
+    for fen, counts in PERFT_POSITIONS:
+        for depth, expected in enumerate(counts, 1):
+            start = time.perf_counter()
+            nodes = perft(SearchBoard(chess.Board(fen)), depth)
+            status = 'ok' if nodes == expected else f'FAILED, expected {expected}'
+            failed |= nodes != expected
+            print(f'perft {depth} {nodes:>8} {time.perf_counter() - start:6.2f}s {status}  {fen}')
+    difference = check_random_games(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
+    print(difference or 'random games: SearchBoard matched python-chess')
+    sys.exit(1 if failed or difference else 0)
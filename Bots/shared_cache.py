@@ -0,0 +1,146 @@
+"""
+Position cache shared between processes, so that worker processes playing the same bots from the same openings
+don't each search the same early positions again. Search results (depth, score and best move) are stored against the
+position's polyglot Zobrist hash (SearchBoard.key) in a fixed size table in multiprocessing.shared_memory.
+
+Nothing is locked. Each slot is two 64 bit words, the packed data and the key XORed with the data. A reader only accepts
+a slot when the two words XOR back to the key it is looking for, so a slot which another process was halfway through
+writing just looks like a miss. The hit/probe counters in the header are updated without locking as well, so with
+several processes writing at once they can come out slightly low.
+
+Bots configured differently mustn't play each other's moves, so bots XOR a fingerprint of their settings (see config_key)
+into the position key. Only bots with exactly the same settings see each other's results.
+"""
+
+import hashlib
+from multiprocessing import shared_memory
+
+MAGIC = 0x43425043 # 'CBPC'
+HEADER_WORDS = 4 # magic, probes, hits, stores
+SLOT_BYTES = 16
+SCORE_OFFSET = 1 << 31
+
+_attached = {} # name to the cache attached in this process, so every bot in a process shares one mapping
+
+def config_key(*settings):
+    """
+    64 bit fingerprint of a bot's settings, the same in every process (unlike hash()).
+    """
+    return int.from_bytes(hashlib.blake2b(repr(settings).encode('utf-8'), digest_size=8).digest(), 'little')
+
+def attach(name):
+    """
+    Returns the cache with the given shared memory name, attaching to it if this process hasn't yet.
+    This is what a pickled cache turns back into in a worker process.
+    """
+    cache = _attached.get(name)
+    if cache is None:
+        cache = SharedPositionCache(name=name)
+    return cache
+
+class SharedPositionCache:
+    """
+    Fixed size table of max_memory bytes in shared memory, mapping positions to (depth, score, best_move).
+    Creating one allocates the shared memory, and it pickles by name, so it can be handed to bots which get sent to worker
+    processes and they'll all read and write the same table. The creating process should close() it when done (or use it as
+    a context manager), which frees the memory. Best moves are the packed ints from Bots.moves.
+    """
+    def __init__(self, max_memory=16 * 1024 * 1024, name=None):
+        if name is None:
+            slots = max(1, max_memory // SLOT_BYTES)
+            self.memory = shared_memory.SharedMemory(create=True, size=8 * HEADER_WORDS + SLOT_BYTES * slots)
+            self.owner = True
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.name = self.memory.name
+        # the buffer can be rounded up to a whole number of pages, only whole slots get used
+        self.table = self.memory.buf.cast('Q')
+        self.slots = (len(self.table) - HEADER_WORDS) // 2
+        if self.owner:
+            self.table[0] = MAGIC
+        elif self.table[0] != MAGIC:
+            self.close()
+            raise ValueError(f'{name} is not a shared position cache')
+        _attached[self.name] = self
+
+    def __reduce__(self):
+        return attach, (self.name,)
+
+    def probe(self, key):
+        """
+        Returns (depth, score, best_move) for the position, or None if it isn't stored.
+        """
+        table = self.table
+        table[1] += 1
+        index = HEADER_WORDS + 2 * (key % self.slots)
+        data = table[index + 1]
+        if not data or table[index] ^ data != key:
+            return None
+        table[2] += 1
+        return (data >> 32) & 0xFF, (data & 0xFFFFFFFF) - SCORE_OFFSET, data >> 48
+
+    def store(self, key, depth, score, best_move):
+        """
+        Stores a search result, unless the slot already holds a deeper search of the same position.
+        """
+        table = self.table
+        index = HEADER_WORDS + 2 * (key % self.slots)
+        old = table[index + 1]
+        if old and table[index] ^ old == key and ((old >> 32) & 0xFF) > depth:
+            return
+        # bits 0-31 score, 32-39 depth, 48-63 move
+        data = ((score + SCORE_OFFSET) & 0xFFFFFFFF) | (min(depth, 255) << 32) | (best_move << 48)
+        table[index + 1] = data
+        table[index] = key ^ data
+        table[3] += 1
+
+    def hit_rate(self):
+        return self.table[2] / self.table[1] if self.table[1] else 0.0
+
+    def usage(self):
+        """
+        Fraction of slots which are filled.
+        """
+        data = self.table[HEADER_WORDS + 1:HEADER_WORDS + 2 * self.slots:2]
+        return sum(1 for word in data if word) / self.slots
+
+    def stats(self):
+        """
+        Totals across every process using the cache.
+        """
+        return {
+            'slots': self.slots,
+            'memory': self.memory.size,
+            'usage': self.usage(),
+            'probes': self.table[1],
+            'hits': self.table[2],
+            'hit_rate': self.hit_rate(),
+            'stores': self.table[3]
+        }
+
+    def clear(self):
+        """
+        Empties the table and resets the counters for every process using it.
+        """
+        buffer = self.memory.buf
+        buffer[8:] = bytes(len(buffer) - 8)
+
+    def close(self):
+        """
+        Detaches from the shared memory, the process which created the cache also frees it.
+        """
+        if self.table is None:
+            return
+        _attached.pop(self.name, None)
+        self.table.release()
+        self.table = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
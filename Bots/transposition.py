@@ -0,0 +1,117 @@
+"""
+Transposition table for the search bots. Positions are keyed on their polyglot Zobrist hash (SearchBoard.key)
+so that the same position reached through a different move order is only searched once.
+"""
+
+from array import array
+from Bots.moves import encode_move, decode_move
+
+EXACT = 0
+LOWER = 1 # score is at least this (beta cutoff)
+UPPER = 2 # score is at most this (failed low)
+
+DEPTH_PREFERRED = 'depth'
+ALWAYS_REPLACE = 'always'
+
+ENTRY_BYTES = 16 # 8 byte key plus 8 bytes of packed data
+SCORE_OFFSET = 1 << 31
+
+class TranspositionTable:
+    """
+    Fixed size table backed by two arrays of unsigned 64 bit ints, so memory use is fixed up front by max_memory (in bytes).
+    Each entry packs the score, depth, bound type and best move into a single int alongside the full key.
+    With the depth preferred policy an entry is only overwritten by a search at least as deep,
+    or by a position from a newer search (see new_search), while always replace keeps the most recent entry.
+    With packed_moves=True best moves are stored and returned as the packed ints from Bots.moves (as used by SearchBoard)
+    rather than as chess.Move objects.
+    """
+    def __init__(self, max_memory=16 * 1024 * 1024, policy=DEPTH_PREFERRED, packed_moves=False):
+        if policy not in (DEPTH_PREFERRED, ALWAYS_REPLACE):
+            raise ValueError(f'Unknown replacement policy: {policy}')
+        self.size = max(1, max_memory // ENTRY_BYTES)
+        self.policy = policy
+        self.packed_moves = packed_moves
+        self.keys = array('Q', bytes(8 * self.size))
+        self.data = array('Q', bytes(8 * self.size))
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def new_search(self):
+        """
+        Marks entries from earlier searches as stale so they can be replaced regardless of depth.
+        """
+        self.generation = (self.generation + 1) & 0x3F
+
+    def clear(self):
+        self.keys = array('Q', bytes(8 * self.size))
+        self.data = array('Q', bytes(8 * self.size))
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def probe(self, key):
+        """
+        Returns (depth, bound, score, best_move) for the position, or None if it isn't stored.
+        best_move is None when the entry doesn't have one.
+        """
+        self.probes += 1
+        index = key % self.size
+        if self.keys[index] != key:
+            return None
+        data = self.data[index]
+        if not data:
+            return None
+        self.hits += 1
+        score = (data & 0xFFFFFFFF) - SCORE_OFFSET
+        depth = (data >> 32) & 0xFF
+        bound = (data >> 40) & 0x3
+        move = (data >> 48) & 0xFFFF
+        if not move:
+            return depth, bound, score, None
+        return depth, bound, score, move if self.packed_moves else decode_move(move)
+
+    def store(self, key, depth, bound, score, best_move=None):
+        index = key % self.size
+        data = self.data[index]
+        if data and self.policy == DEPTH_PREFERRED:
+            same_search = ((data >> 42) & 0x3F) == self.generation
+            if same_search and ((data >> 32) & 0xFF) > depth and self.keys[index] != key:
+                return
+        if data and self.keys[index] != key:
+            self.overwrites += 1
+
+        if not best_move:
+            move = 0
+        else:
+            move = best_move if self.packed_moves else encode_move(best_move)
+        self.keys[index] = key
+        # bits 0-31 score, 32-39 depth, 40-41 bound, 42-47 generation, 48-63 move
+        self.data[index] = ((score + SCORE_OFFSET) & 0xFFFFFFFF) | (min(depth, 255) << 32) | (bound << 40) | (self.generation << 42) | (move << 48)
+        self.stores += 1
+
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+    def usage(self):
+        """
+        Fraction of slots which are filled.
+        """
+        return sum(1 for data in self.data if data) / self.size
+
+    def stats(self):
+        return {
+            'size': self.size,
+            'memory': self.size * ENTRY_BYTES,
+            'probes': self.probes,
+            'hits': self.hits,
+            'hit_rate': self.hit_rate(),
+            'stores': self.stores,
+            'overwrites': self.overwrites
+        }
@@ -0,0 +1,144 @@
+"""
+Adapter which lets UCI engines (Stockfish and the like) play as bots, mixed freely with the Python bots.
+Starting an engine takes far longer than most moves, so engines aren't tied to a bot or a game. Every UciBot in a process
+borrows an engine from a shared pool for each move and hands it back afterwards, which keeps the same few engine processes
+running for every game played on that process (or on any of its threads). Worker processes each get their own pool.
+"""
+
+import atexit
+import os
+import shlex
+import sys
+import threading
+import time
+import chess
+import chess.engine
+
+DEFAULT_MOVE_TIME = 0.1 # seconds per move when a bot is given no other limit
+MOVE_OVERHEAD = 0.01 # seconds kept back from a deadline for talking to the engine
+
+class EnginePool:
+    """
+    Idle engine processes kept per command and options, for reuse by every UciBot in the process.
+    Engines are started on demand, so there are never more than the number of moves being worked out at once.
+    Engines are quit when the process exits.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.idle = {} # (command, options) to a list of idle engines
+        self.engines = [] # every engine started by this pool
+        self.started = 0
+
+    def reset(self):
+        # engines inherited through fork belong to the parent, the child starts with an empty pool
+        self.lock = threading.Lock()
+        self.idle = {}
+        self.engines = []
+        self.started = 0
+
+    def acquire(self, command, options=None):
+        """
+        Returns an idle engine for the command, starting a new one if there isn't one.
+        Give it back with release(), or discard() it if it stopped working.
+        """
+        key = (tuple(command), tuple(sorted((options or {}).items())))
+        with self.lock:
+            idle = self.idle.get(key)
+            if idle:
+                return idle.pop()
+        engine = chess.engine.SimpleEngine.popen_uci(list(command))
+        if options:
+            engine.configure(options)
+        engine.pool_key = key
+        with self.lock:
+            self.engines.append(engine)
+            self.started += 1
+        return engine
+
+    def release(self, engine):
+        with self.lock:
+            self.idle.setdefault(engine.pool_key, []).append(engine)
+
+    def discard(self, engine):
+        with self.lock:
+            if engine in self.engines:
+                self.engines.remove(engine)
+        self.quit(engine)
+
+    @staticmethod
+    def quit(engine):
+        try:
+            engine.quit()
+        except (chess.engine.EngineError, TimeoutError):
+            engine.close()
+
+    def close(self):
+        """
+        Quits every engine the pool has started.
+        """
+        with self.lock:
+            engines, self.engines, self.idle = self.engines, [], {}
+        for engine in engines:
+            self.quit(engine)
+
+engine_pool = EnginePool()
+# each engine runs on a non-daemon thread which the interpreter waits for before atexit handlers run,
+# so engines are quit from threading's own exit hook (which worker processes run too) where there is one
+getattr(threading, '_register_atexit', atexit.register)(engine_pool.close)
+os.register_at_fork(after_in_child=engine_pool.reset)
+
+def engine_command(command):
+    """
+    Splits a command string into arguments. Python scripts are run with the current interpreter.
+    """
+    command = shlex.split(command) if isinstance(command, str) else list(command)
+    if command[0].endswith('.py'):
+        command.insert(0, sys.executable)
+    return command
+
+class UciBot:
+    """
+    Bot which gets its moves from a UCI engine, e.g. UciBot('/usr/bin/stockfish', depth=10, options={'Threads': 1}).
+    command is the engine's path or a list of arguments. Each move is limited by move_time seconds, depth and/or nodes,
+    and by the deadline when games are played with a time limit. With no limit at all it thinks for DEFAULT_MOVE_TIME.
+    options are UCI options set when an engine is started. Engines come from the process wide engine_pool.
+    """
+    def __init__(self, command, name=None, move_time=None, depth=None, nodes=None, options=None):
+        self.command = engine_command(command)
+        self.name = name or f'UCI {os.path.splitext(os.path.basename(self.command[-1]))[0]}'
+        self.move_time = move_time
+        self.depth = depth
+        self.node_limit = nodes
+        self.options = options or {}
+        self.side = None
+        self.deadline = None
+        self.wins = 0
+        self.losses = 0
+        self.draws = 0
+        self.info = {} # what the engine reported about its last move
+
+    def limit(self):
+        move_time = self.move_time
+        if self.deadline is not None:
+            time_left = max(self.deadline - time.monotonic() - MOVE_OVERHEAD, 0.001)
+            move_time = time_left if move_time is None else min(move_time, time_left)
+        if move_time is None and self.depth is None and self.node_limit is None:
+            move_time = DEFAULT_MOVE_TIME
+        return chess.engine.Limit(time=move_time, depth=self.depth, nodes=self.node_limit)
+
+    def get_move(self, board, legal_moves=None):
+        engine = engine_pool.acquire(self.command, self.options)
+        try:
+            # game=self tells the engine when it has switched to a different game so it can clear its state
+            result = engine.play(board, self.limit(), game=self, info=chess.engine.INFO_BASIC)
+        except (chess.engine.EngineError, TimeoutError):
+            # the engine crashed or hung, it gets replaced and the game loop asks again
+            engine_pool.discard(engine)
+            self.info = {}
+            return None
+        engine_pool.release(engine)
+        self.info = result.info
+        return result.move
+
+    def search_stats(self):
+        return {key: self.info[key] for key in ('nodes', 'depth') if key in self.info}
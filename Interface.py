@@ -4,11 +4,20 @@ import random
 import json
 import datetime
 import os
-import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from PyQt5.QtSvg import QSvgWidget
+import time
+import traceback
+from collections import OrderedDict
+from Runner.game import DRAW_TERMINATIONS, MAX_ILLEGAL_MOVES, game_context, is_legal_move, play_game, timed_move
+from Runner.instrumentation import SIDES, MoveProfile, collect_profiles, print_profiles, side_names
+from Runner.openings import book_move
+from Runner.pool import as_bot, iter_games
+from Runner.results import MatchStats
+from Runner.sprt import run_sprt
+from Runner.tournament import Tournament, print_standings
+from PyQt5.QtSvg import QSvgRenderer, QSvgWidget
 from PyQt5.QtWidgets import QApplication, QWidget, QPushButton, QVBoxLayout, QLabel, QSizePolicy, QMessageBox, QCheckBox
-from PyQt5.QtCore import QByteArray, Qt, QTimer
+from PyQt5.QtCore import QByteArray, QObject, QRect, Qt, QThread, QTimer, pyqtSignal
+from PyQt5.QtGui import QColor, QPainter, QPixmap
 
 WINDOW_WIDTH = 800
 WINDOW_HEIGHT = 800
@@ -17,7 +26,7 @@ CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 def save_recording(move_list, bot1, bot2):
     now = datetime.datetime.now()
 
-    title = f'({bot1.name})VS({bot2.name})-{now.day}-{now.hour}-{now.minute}-{now.second}.json'
+    title = f'({bot1.name})VS({bot2.name})-{now.day}-{now.hour}-{now.minute}-{now.second}-{now.microsecond}.json'
     with open(f'{CURRENT_DIR}/recordings/{title}', 'w') as file:
         if bot1.side == chess.BLACK: 
             bot1_side = 'Black'
@@ -59,8 +68,129 @@ def prompt_recording(moves, bot1, bot2):
     msg.buttonClicked.connect(lambda btn: handle_button_click(msg.standardButton(btn)))
     msg.exec_()
 
+class SvgBoardWidget(QSvgWidget):
+    """
+    Displays the board as an svg generated by python-chess. Generated svgs are cached on the piece placement,
+    check square and last move, so positions which come up again (repetitions, restarted games) are only generated once.
+    """
+    def __init__(self, cache_size=512):
+        super().__init__()
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+
+    def show_board(self, board):
+        lastmove = board.peek() if board.move_stack else None
+        check_square = board.king(board.turn) if board.is_check() else None
+        key = (board.board_fen(), check_square, lastmove)
+
+        svg_data = self.cache.get(key)
+        if svg_data is None:
+            svg_data = chess.svg.board(board=board, check=check_square, lastmove=lastmove).encode('UTF-8')
+            self.cache[key] = svg_data
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+        self.load(QByteArray(svg_data))
+
+class RasterBoardWidget(QWidget):
+    """
+    Draws the board with QPainter instead of loading a new svg every move. The piece images are rendered once
+    (and again whenever the window is resized) and after each move only the squares which changed get repainted.
+    """
+    CHECK_COLOR = QColor(255, 0, 0, 150)
+
+    def __init__(self):
+        super().__init__()
+        self.pieces = {} # square -> chess.Piece
+        self.lastmove = None
+        self.check_square = None
+        self.sprites = {}
+        self.sprite_size = 0
+        self.colors = {name: QColor(chess.svg.DEFAULT_COLORS[name]) for name in
+                       ['square light', 'square dark', 'square light lastmove', 'square dark lastmove']}
+
+    def square_size(self):
+        return max(1, min(self.width(), self.height()) // 8)
+
+    def square_rect(self, square):
+        size = self.square_size()
+        return QRect(chess.square_file(square) * size, (7 - chess.square_rank(square)) * size, size, size)
+
+    def render_sprites(self, size):
+        self.sprites = {}
+        for color in chess.COLORS:
+            for piece_type in chess.PIECE_TYPES:
+                piece = chess.Piece(piece_type, color)
+                pixmap = QPixmap(size, size)
+                pixmap.fill(Qt.transparent)
+                painter = QPainter(pixmap)
+                QSvgRenderer(QByteArray(chess.svg.piece(piece).encode('UTF-8'))).render(painter)
+                painter.end()
+                self.sprites[piece] = pixmap
+        self.sprite_size = size
+
+    def show_board(self, board):
+        pieces = board.piece_map()
+        lastmove = board.peek() if board.move_stack else None
+        check_square = board.king(board.turn) if board.is_check() else None
+
+        changed = {square for square in set(pieces) | set(self.pieces) if pieces.get(square) != self.pieces.get(square)}
+        # highlights which were added or removed
+        for move in (self.lastmove, lastmove):
+            if move is not None:
+                changed.update((move.from_square, move.to_square))
+        changed.update(square for square in (self.check_square, check_square) if square is not None)
+
+        self.pieces = pieces
+        self.lastmove = lastmove
+        self.check_square = check_square
+        for square in changed:
+            self.update(self.square_rect(square))
+
+    def paintEvent(self, event):
+        size = self.square_size()
+        if size != self.sprite_size:
+            self.render_sprites(size)
+
+        painter = QPainter(self)
+        region = event.region()
+        highlighted = (self.lastmove.from_square, self.lastmove.to_square) if self.lastmove else ()
+        for square in chess.SQUARES:
+            rect = self.square_rect(square)
+            if not region.intersects(rect):
+                continue
+            shade = 'light' if (chess.square_file(square) + chess.square_rank(square)) % 2 else 'dark'
+            name = f'square {shade} lastmove' if square in highlighted else f'square {shade}'
+            painter.fillRect(rect, self.colors[name])
+            if square == self.check_square:
+                painter.fillRect(rect, self.CHECK_COLOR)
+            piece = self.pieces.get(square)
+            if piece is not None:
+                painter.drawPixmap(rect.topLeft(), self.sprites[piece])
+        painter.end()
+
+class MoveWorker(QObject):
+    """
+    Calls get_move on a background thread so the window stays responsive while a bot is thinking.
+    Every request carries the id of the game it belongs to, which is sent back alongside the move.
+    If a MoveProfile is sent along the call is timed with it.
+    """
+    move_ready = pyqtSignal(int, object)
+    move_failed = pyqtSignal(int, str)
+
+    def compute_move(self, game_id, bot, board, profile=None, legal_moves=None):
+        try:
+            move = timed_move(bot, board, profile, legal_moves)
+        except Exception:
+            self.move_failed.emit(game_id, traceback.format_exc())
+        else:
+            self.move_ready.emit(game_id, move)
+
 class MainWindow(QWidget):
-    def __init__(self, bot1, bot2):
+    move_requested = pyqtSignal(int, object, object, object, object)
+
+    def __init__(self, bot1, bot2, raster=False, instrument=False):
         super().__init__()
         # Chess properties
         self.bot1 = bot1
@@ -68,15 +198,29 @@ class MainWindow(QWidget):
         self.bot1_turn = None
         self.board = None
         self.moves = []
+        self.game_id = 0 # moves computed for an earlier game are thrown away
+        self.pending_bot = None # copy of the bot which is currently working out a move
+        self.illegal_moves = 0 # illegal moves in a row from the bot whose turn it is
+        self.instrument = instrument
+        self.profiles = None # side ('bot1' or 'bot2') to MoveProfile for the current game when instrumented
+
+        # Bots run on their own thread, results come back through signals
+        self.move_thread = QThread(self)
+        self.move_worker = MoveWorker()
+        self.move_worker.moveToThread(self.move_thread)
+        self.move_requested.connect(self.move_worker.compute_move)
+        self.move_worker.move_ready.connect(self.receive_move)
+        self.move_worker.move_failed.connect(self.move_failed)
+        self.move_thread.start()
 
         # Window settings
         self.setGeometry(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT + 150)
         self.setWindowTitle(f'{bot1.name} Vs {bot2.name}')
         layout = QVBoxLayout()
         self.setLayout(layout)
-        self.widgetSvg = QSvgWidget()
-        self.widgetSvg.setGeometry(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT)
-        layout.addWidget(self.widgetSvg)
+        self.board_widget = RasterBoardWidget() if raster else SvgBoardWidget()
+        self.board_widget.setGeometry(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT)
+        layout.addWidget(self.board_widget)
 
         # Labels
         self.bot1_label = QLabel()
@@ -100,18 +244,20 @@ class MainWindow(QWidget):
         self.auto_move_checkbox.stateChanged.connect(self.toggle_auto_move)
         layout.addWidget(self.auto_move_checkbox)
 
-        self.auto_move_timer = QTimer(self)
-        self.auto_move_timer.timeout.connect(self.make_move)
-        self.auto_move_timer.setInterval(200)  # 5 moves per second (1000ms / 5 = 200ms)
         self.start_game()
 
     def toggle_auto_move(self, state):
         if state == Qt.Checked:
-            self.auto_move_timer.start()
             self.moveButton.setEnabled(False)
+            self.make_move()
         else:
-            self.auto_move_timer.stop()
-            self.moveButton.setEnabled(True)
+            self.moveButton.setEnabled(self.pending_bot is None)
+
+    def closeEvent(self, event):
+        self.cancel_move()
+        self.move_thread.quit()
+        self.move_thread.wait()
+        super().closeEvent(event)
 
     def display_winner(self, winner, loser, moves, draw=False):
         dialog = QMessageBox(self)
@@ -134,10 +280,25 @@ class MainWindow(QWidget):
         else:
             QApplication.quit()
 
+    def cancel_move(self):
+        """
+        Drops the move currently being worked out. Bots which respect their deadline are told to stop searching straight away,
+        through the copy of the bot made for that request.
+        """
+        self.game_id += 1
+        if self.pending_bot is not None:
+            self.pending_bot.deadline = time.monotonic()
+            self.pending_bot = None
+
     def start_game(self):
+        self.cancel_move()
         self.auto_move_checkbox.setChecked(False)
-        self.auto_move_timer.stop()
         self.moveButton.setEnabled(True)
+        self.moves = []
+        self.illegal_moves = 0
+        if self.instrument:
+            names = side_names(self.bot1.name, self.bot2.name)
+            self.profiles = {side: MoveProfile(name) for side, name in zip(SIDES, names)}
 
         if random.choice([0, 1]) == 1:
             self.bot1_turn = True
@@ -157,162 +318,227 @@ class MainWindow(QWidget):
 
     def display_board(self):
         """
-        Generates an svg of the board and displays it.
-        Should make this color the square of the piece which just moved.
+        Shows the current board, highlighting the last move and the king if it's in check.
         """
-        if self.board.is_check():
-            # White in check
-            if self.board.turn == chess.WHITE: 
-                check_square = self.board.king(chess.WHITE)
-            else:
-                check_square = self.board.king(chess.BLACK)
-            svg_data = chess.svg.board(board=self.board, check=check_square).encode('UTF-8')
-        else:
-            svg_data = chess.svg.board(board=self.board).encode('UTF-8')
-        
-        self.widgetSvg.load(QByteArray(svg_data))
+        self.board_widget.show_board(self.board)
 
     def make_move(self):
-        if not self.board.is_game_over():
-            legal_moves = list(self.board.legal_moves)
-            if self.bot1_turn:
-                move = self.bot1.get_move(self.board)
-            else:
-                move = self.bot2.get_move(self.board)
-
-            if move in legal_moves:
-                self.moves.append(self.board.san(move))
-                self.board.push(move)
-                self.bot1_turn = not self.bot1_turn
-                self.display_board()
-            else: # redo if move was invalid
+        if self.pending_bot is not None:
+            return
+
+        if self.board.is_game_over():
+            self.game_over()
+            return
+
+        bot = self.bot1 if self.bot1_turn else self.bot2
+        profile = self.profiles['bot1' if self.bot1_turn else 'bot2'] if self.profiles else None
+        legal_moves = list(self.board.legal_moves)
+        move = book_move(bot, self.board)
+        if move is not None:
+            self.receive_move(self.game_id, move)
+        elif getattr(bot, 'runs_on_gui_thread', False):
+            # bots which open dialogs (e.g. HumanNotBot) have to run here
+            self.receive_move(self.game_id, timed_move(bot, self.board, profile, legal_moves))
+        else:
+            # every request gets its own copy of the bot, so cancelling it (which sets the copy's deadline)
+            # can't affect later requests, and a new request never un-cancels a search still running
+            request = game_context(bot)
+            request.deadline = None
+            self.pending_bot = request
+            self.moveButton.setEnabled(False)
+            self.move_requested.emit(self.game_id, request, self.board.copy(), profile, legal_moves)
+
+    def receive_move(self, game_id, move):
+        if game_id != self.game_id: # from a cancelled game
+            return
+        self.pending_bot = None
+        auto_move = self.auto_move_checkbox.isChecked()
+        self.moveButton.setEnabled(not auto_move)
+
+        if is_legal_move(self.board, move):
+            self.illegal_moves = 0
+            self.moves.append(self.board.san(move))
+            self.board.push(move)
+            self.bot1_turn = not self.bot1_turn
+            self.display_board()
+            if self.board.is_game_over():
+                self.game_over()
+                return
+        else:
+            bot = self.bot1 if self.bot1_turn else self.bot2
+            self.illegal_moves += 1
+            if self.illegal_moves >= MAX_ILLEGAL_MOVES:
+                print(f'{bot.name} forfeits after {self.illegal_moves} invalid moves')
+                self.game_over(forfeited_by=bot)
+            else: # ask again
                 print('Invalid move')
-                self.make_move()
+                QTimer.singleShot(0, self.make_move)
+            return
+
+        if auto_move:
+            # queued rather than called directly so the board gets drawn before the next move is requested
+            QTimer.singleShot(0, self.make_move)
+
+    def move_failed(self, game_id, error):
+        if game_id != self.game_id:
+            return
+        self.pending_bot = None
+        print(error)
+        self.auto_move_checkbox.setChecked(False)
+        self.moveButton.setEnabled(True)
 
-        else:
-            # Stop timer if game over
-            self.auto_move_timer.stop()
-            self.auto_move_checkbox.setChecked(False)
+    def game_over(self, forfeited_by=None):
+        self.auto_move_checkbox.setChecked(False)
+        if self.profiles:
+            print_profiles(self.profiles)
+
+        outcome = self.board.outcome()
+        moves = self.moves
+        if forfeited_by is not None:
+            winner = self.bot2 if forfeited_by is self.bot1 else self.bot1
+            winner.wins += 1
+            forfeited_by.losses += 1
+            self.display_winner(winner, forfeited_by, moves)
+            prompt_recording(moves, self.bot1, self.bot2)
+
+        elif outcome:
+            winner = outcome.winner
+
+            # game is a draw
+            if outcome.termination in DRAW_TERMINATIONS:
+                self.bot1.draws += 1
+                self.bot2.draws += 1
+                self.display_winner(self.bot1, self.bot2, moves, True)
+
+            # bot1 wins
+            elif winner == self.bot1.side:
+                self.bot1.wins += 1
+                self.bot2.losses += 1
+                self.display_winner(self.bot1, self.bot2, moves)
+
+            # bot2 wins
+            else:
+                self.bot1.losses += 1
+                self.bot2.wins += 1
+                self.display_winner(self.bot2, self.bot1, moves)
             
-            outcome = self.board.outcome()
-            if outcome:
-                winner = outcome.winner
-
-                # game is a draw
-                if outcome.termination in [chess.Termination.STALEMATE, chess.Termination.INSUFFICIENT_MATERIAL, chess.Termination.THREEFOLD_REPETITION, chess.Termination.FIFTY_MOVES]:
-                    self.bot1.draws += 1
-                    self.bot2.draws += 1
-                    self.display_winner(self.bot1, self.bot2, self.moves, True)
-
-                # bot1 wins
-                elif (winner == chess.WHITE and self.bot1.side == chess.WHITE) or (winner == chess.BLACK and self.bot1.side == chess.BLACK):
-                    self.bot1.wins += 1
-                    self.bot2.losses += 1
-                    self.display_winner(self.bot1, self.bot2, self.moves)
-
-                # bot2 wins
-                else:
-                    self.bot1.losses += 1
-                    self.bot2.wins += 1
-                    self.display_winner(self.bot2, self.bot1, self.moves)
-                
-                prompt_recording(self.moves, self.bot1, self.bot2)
+            prompt_recording(moves, self.bot1, self.bot2)
 
 class Interface:
     def __init__(self, bot1=None, bot2=None):
         self.bot1 = bot1
         self.bot2 = bot2
 
-    def start_GUI(self):
+    def start_GUI(self, raster=False, instrument=False):
+        """
+        Opens a window where the interface's bots play each other.
+        With raster=True the board is painted directly rather than through svgs, which is faster at auto move speeds.
+        With instrument=True each bot's move times and counters are printed at the end of every game.
+        """
         if self.bot1 is None or self.bot2 is None:
             raise Exception("The interface's bot1 and bot2 cannot be None")
         
         app = QApplication([])
-        window = MainWindow(self.bot1, self.bot2)
+        window = MainWindow(self.bot1, self.bot2, raster, instrument)
 
         window.show()
         app.exec_()
 
-    def play_game(self, bot1=None, bot2=None):
+    def play_game(self, bot1=None, bot2=None, move_time=None, game_time=None, recorder=None):
         """
         Plays a game with the bots which are passed in, otherwise uses the bots assigned to the interface.
+        move_time and game_time limit how many seconds each bot gets per move and per game.
+        If a BatchRecorder is passed the game is recorded with it.
         Returns the winner of the game, else None if the game was a draw.
         """
         if bot1 is None: bot1 = self.bot1
         if bot2 is None: bot2 = self.bot2
 
-        board = chess.Board()
-        if random.choice([0, 1]) == 1:
-            bot1_turn = True
-            bot1.side = chess.WHITE
-            bot2.side = chess.BLACK
-        else:
-            bot1_turn = False
-            bot1.side = chess.BLACK
-            bot2.side = chess.WHITE
-
-        while not board.is_game_over():
-            if bot1_turn:
-                move = bot1.get_move(board)
-            else:
-                move = bot2.get_move(board)
-
-            board.push(move)
-            bot1_turn = not bot1_turn
-
-        outcome = board.outcome()
-        if outcome:
-            winner = outcome.winner
-
-            # game is a draw
-            if outcome.termination in [chess.Termination.STALEMATE, chess.Termination.INSUFFICIENT_MATERIAL, chess.Termination.THREEFOLD_REPETITION, chess.Termination.FIFTY_MOVES]:
-                bot1.draws += 1
-                bot2.draws += 1
-                return None
-            
-            # bot1 wins
-            elif (winner == chess.WHITE and self.bot1.side == chess.WHITE) or (winner == chess.BLACK and self.bot1.side == chess.BLACK):
-                bot1.wins += 1
-                bot2.losses += 1
-                return bot1
-            
-            # bot2 wins
-            else:
-                bot1.losses += 1
-                bot2.wins += 1
-                return bot2
-
-    def play_games(self, games, bot1=None, bot2=None):
+        result = play_game(bot1, bot2, move_time=move_time, game_time=game_time)
+        if recorder is not None:
+            recorder.record(result)
+        stats = MatchStats(bot1.name, bot2.name)
+        stats.add(result)
+        stats.apply(bot1, bot2)
+
+        if result.winner == 'bot1':
+            return bot1
+        elif result.winner == 'bot2':
+            return bot2
+        return None
+
+    def play_games(self, games, bot1=None, bot2=None, workers=None, use_processes=False, move_time=None, game_time=None, recorder=None,
+                   openings=None, instrument=False, profile=False, adjudication=None):
+        """
+        Plays the given number of games between two bots, prints the stats once they are done and returns them as MatchStats.
+        With use_processes=True the games are spread over worker processes which lets CPU heavy bots use every core.
+        In that mode bot1 and bot2 may also be bot classes or BotFactory instances, e.g. BotFactory(nMoveBasicEvalBot, 2).
+        move_time and game_time limit how many seconds each bot gets per move and per game.
+        If a BatchRecorder is passed every game is recorded with it.
+        openings can be a list of starting FENs, a FEN/EPD file or a polyglot book, each opening is played with both colours.
+        With instrument=True a latency histogram and the counters each bot reports are printed at the end,
+        profile=True adds the functions each bot spent the most time in (best used with use_processes=True).
+        An Adjudication (see Runner.termination) ends hopeless or overlong games early.
+        """
         if bot1 is None: bot1 = self.bot1
         if bot2 is None: bot2 = self.bot2
-        
-        print_lock = threading.Lock()
-        game_counter = 0
-
-        def play_single_game():
-            nonlocal game_counter
-            self.play_game(bot1, bot2)
-            with print_lock:
-                nonlocal game_counter
-                game_counter += 1
-                print(f"Game {game_counter} completed")
-
-        with ThreadPoolExecutor() as executor:
-            futures = [executor.submit(play_single_game) for _ in range(games)]
-            
-            # Wait for all games to complete
-            for future in as_completed(futures):
-                future.result()
+
+        # bots passed in as instances get the stats added on at the end, for classes and factories
+        # throwaway bots are built here just for their names while the games are played with the factories themselves
+        player1, player2 = as_bot(bot1), as_bot(bot2)
+
+        # results are folded together on this thread as they come in so no locking is needed
+        stats = MatchStats(player1.name, player2.name)
+        profiles = {}
+        for result in iter_games(games, bot1, bot2, workers, use_processes, move_time, game_time, openings=openings,
+                                 instrument=instrument, profile=profile, adjudication=adjudication):
+            stats.add(result)
+            collect_profiles(profiles, result)
+            if recorder is not None:
+                recorder.record(result)
+            print(f"Game {stats.games} completed")
+        stats.apply(player1, player2)
         
         print('\nAll games completed\n')
         print('Game Stats:')
-        print(f'Draw %: {(round(self.bot1.draws/games, 2)) * 100}%')
-        print(f'{self.bot1.name} winrate: {(self.bot1.wins/games) * 100}%')
-        print(f'{self.bot2.name} winrate: {(self.bot2.wins/games) * 100}%')
-        print(f'{self.bot1.name} # of wins: {self.bot1.wins}')
-        print(f'{self.bot2.name} # of wins: {self.bot2.wins}')
+        print(f'Draw %: {(round(stats.draws/games, 2)) * 100}%')
+        print(f'{player1.name} winrate: {(stats.bot1_wins/games) * 100}%')
+        print(f'{player2.name} winrate: {(stats.bot2_wins/games) * 100}%')
+        print(f'{player1.name} # of wins: {player1.wins}')
+        print(f'{player2.name} # of wins: {player2.wins}')
+        if profiles:
+            print('\nBot Profiles:')
+            print_profiles(profiles)
+        return stats
+
+    def run_sprt(self, bot1=None, bot2=None, elo0=0, elo1=10, alpha=0.05, beta=0.05, max_games=10000, **options):
+        """
+        Plays games until a sequential probability ratio test can tell whether bot1 is at least elo1 stronger than bot2 (H1)
+        or at most elo0 stronger (H0), instead of playing a fixed number of games. Prints and returns the SPRT.
+        See Runner.sprt.run_sprt for the options.
+        """
+        if bot1 is None: bot1 = self.bot1
+        if bot2 is None: bot2 = self.bot2
+
+        sprt = run_sprt(bot1, bot2, elo0, elo1, alpha, beta, max_games, **options)
+        print(sprt.summary())
+        return sprt
+
+    def run_tournament(self, bots, format='round_robin', **options):
+        """
+        Plays a round robin, Swiss or knockout tournament with every pairing of a round played at the same time,
+        then prints the standings with Elo and BayesElo ratings. See Runner.tournament.Tournament for the options.
+        Returns the standings.
+        """
+        standings = Tournament(bots, format, **options).run()
+        print_standings(standings)
+        return standings
 
-    def run_knockout(self, bots):
+    def run_knockout(self, bots, recorder=None):
+        """
+        Plays a knockout tournament between the bots, drawn matches are replayed.
+        If a BatchRecorder is passed every game (including the drawn ones) is recorded with it.
+        """
         round_number = 1
         placements = []
         while len(bots) > 1:
@@ -322,7 +548,7 @@ class Interface:
                 bot1 = bots.pop(random.randint(0, len(bots) - 1))
                 bot2 = bots.pop(random.randint(0, len(bots) - 1))
                 print(f"Match: {bot1.name} vs {bot2.name}")
-                winner = self.play_game(bot1, bot2)
+                winner = self.play_game(bot1, bot2, recorder=recorder)
                 if winner is None:
                     print("Draw: Starting new match...\n")
                     bots.extend([bot1, bot2])  # Add both bots back to replay the match
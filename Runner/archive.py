@@ -0,0 +1,238 @@
+"""
+Compact binary archive for storing large numbers of games in one file.
+
+Layout (all little endian):
+    header   36 bytes: magic, version, game count and the offset of the game index (see HEADER)
+    games    one record per game, appended one after the other
+    index    game count * uint64 offsets of each record, written when the archive is closed
+
+Each record is a fixed size struct (see RECORD) followed by the utf-8 bot names, the starting FEN
+(empty for the standard starting position) and the moves packed into 16 bits each (see Bots.moves).
+While an archive is open for writing the header's index offset is 0, if the writer never got to close it
+the reader rebuilds the index by walking the records.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+import chess
+import chess.pgn
+from Bots.moves import decode_move, encode_move
+from Runner.results import GameResult
+
+MAGIC = b'CBGAMES\0'
+VERSION = 1
+HEADER = struct.Struct('<8sHHIQQ4x') # magic, version, flags, reserved, game count, index offset
+RECORD = struct.Struct('<BBBBHHHHffq') # winner, termination, bot1 white, reserved, plies, name lengths, fen length, times, seed
+NO_SEED = -1
+
+WINNERS = [None, 'bot1', 'bot2']
+# only ever append to this list, the position is what gets stored
+TERMINATIONS = ['checkmate', 'stalemate', 'insufficient_material', 'seventyfive_moves', 'fivefold_repetition',
+                'fifty_moves', 'threefold_repetition', 'variant_win', 'variant_loss', 'variant_draw', 'time_forfeit',
+                'illegal_move', 'adjudicated_resign', 'adjudicated_draw']
+
+def _native(codes):
+    if sys.byteorder == 'big':
+        codes.byteswap()
+    return codes
+
+class ArchiveWriter:
+    """
+    Appends GameResults to an archive, creating it if it doesn't exist yet.
+    Use as a context manager or call close() so the index gets written.
+    """
+    def __init__(self, path):
+        self.path = path
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self.file = open(path, 'r+b' if exists else 'w+b')
+        if exists:
+            reader = ArchiveReader(path)
+            self.offsets = list(reader.offsets)
+            end = reader.data_end
+            reader.close()
+            self.file.seek(end)
+            self.file.truncate()
+        else:
+            self.offsets = []
+            self.file.write(bytes(HEADER.size))
+        self.write_header(0)
+
+    def write_header(self, index_offset):
+        position = self.file.tell()
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, 0, 0, len(self.offsets), index_offset))
+        self.file.seek(position)
+
+    def add(self, result):
+        bot1_name = result.bot1_name.encode('utf-8')
+        bot2_name = result.bot2_name.encode('utf-8')
+        fen = (result.start_fen or '').encode('utf-8')
+        codes = _native(array('H', (encode_move(chess.Move.from_uci(move)) for move in result.moves)))
+        seed = NO_SEED if result.seed is None else result.seed
+
+        self.offsets.append(self.file.tell())
+        self.file.write(RECORD.pack(WINNERS.index(result.winner), TERMINATIONS.index(result.termination), result.bot1_white, 0,
+                                    len(codes), len(bot1_name), len(bot2_name), len(fen), result.bot1_time, result.bot2_time, seed))
+        self.file.write(bot1_name + bot2_name + fen)
+        self.file.write(codes.tobytes())
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        if self.file.closed:
+            return
+        index_offset = self.file.tell()
+        self.file.write(_native(array('Q', self.offsets)).tobytes())
+        self.write_header(index_offset)
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class ArchiveReader:
+    """
+    Reads an archive through mmap, so games are only loaded when they are accessed.
+    Supports len(), indexing and iteration, each game comes back as a GameResult.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, _, count, index_offset = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a game archive')
+        if version > VERSION:
+            raise ValueError(f'{path} was written by a newer version (archive version {version})')
+
+        if index_offset:
+            self.offsets = _native(array('Q', self.data[index_offset:index_offset + 8 * count]))
+            self.data_end = index_offset
+        else:
+            self.offsets, self.data_end = self.scan()
+
+    def scan(self):
+        """
+        Rebuilds the index of an archive which wasn't closed properly by walking over every complete record.
+        """
+        offsets = array('Q')
+        position = HEADER.size
+        while position + RECORD.size <= len(self.data):
+            fields = RECORD.unpack_from(self.data, position)
+            end = position + RECORD.size + fields[5] + fields[6] + fields[7] + 2 * fields[4]
+            if end > len(self.data):
+                break
+            offsets.append(position)
+            position = end
+        return offsets, position
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        position = self.offsets[index]
+        winner, termination, bot1_white, _, plies, name1_length, name2_length, fen_length, bot1_time, bot2_time, seed = \
+            RECORD.unpack_from(self.data, position)
+        position += RECORD.size
+        bot1_name = self.data[position:position + name1_length].decode('utf-8')
+        position += name1_length
+        bot2_name = self.data[position:position + name2_length].decode('utf-8')
+        position += name2_length
+        fen = self.data[position:position + fen_length].decode('utf-8') or None
+        position += fen_length
+        codes = _native(array('H', self.data[position:position + 2 * plies]))
+        moves = tuple(decode_move(code).uci() for code in codes)
+
+        return GameResult(bot1_name, bot2_name, bool(bot1_white), WINNERS[winner], TERMINATIONS[termination], plies, moves,
+                          bot1_time, bot2_time, None if seed == NO_SEED else seed, fen)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def replay(result):
+    """
+    Returns a board with the game's moves played on it.
+    """
+    board = chess.Board(result.start_fen) if result.start_fen else chess.Board()
+    for move in result.moves:
+        board.push_uci(move)
+    return board
+
+def to_pgn(result):
+    """
+    Converts a game to a PGN string.
+    """
+    game = chess.pgn.Game.from_board(replay(result))
+    white, black = (result.bot1_name, result.bot2_name) if result.bot1_white else (result.bot2_name, result.bot1_name)
+    game.headers['White'] = white
+    game.headers['Black'] = black
+    if result.winner is None:
+        game.headers['Result'] = '1/2-1/2'
+    else:
+        white_won = (result.winner == 'bot1') == result.bot1_white
+        game.headers['Result'] = '1-0' if white_won else '0-1'
+    game.headers['Termination'] = result.termination
+    return str(game)
+
+def to_json(result):
+    """
+    Converts a game to the same format the GUI saves recordings in, moves in standard algebraic notation.
+    """
+    board = chess.Board(result.start_fen) if result.start_fen else chess.Board()
+    san_moves = []
+    for move in result.moves:
+        move = chess.Move.from_uci(move)
+        san_moves.append(board.san(move))
+        board.push(move)
+    bot1_side = 'White' if result.bot1_white else 'Black'
+    bot2_side = 'Black' if result.bot1_white else 'White'
+    return {
+        "Bot1": {
+            "Name": result.bot1_name,
+            "Side": bot1_side
+            },
+        "Bot2": {
+            "Name": result.bot2_name,
+            "Side": bot2_side
+            },
+            "Moves": san_moves
+        }
+
+def export_pgn(archive_path, pgn_path):
+    with ArchiveReader(archive_path) as reader, open(pgn_path, 'w') as file:
+        for result in reader:
+            file.write(to_pgn(result) + '\n\n')
+
+def export_json(archive_path, json_path):
+    """
+    Writes every game as a JSON list of recordings.
+    """
+    with ArchiveReader(archive_path) as reader, open(json_path, 'w') as file:
+        json.dump([to_json(result) for result in reader], file, indent=4)
+
+if __name__ == '__main__':
+    # python -m Runner.archive games.cbg games.pgn (or games.json)
+    if len(sys.argv) != 3:
+        sys.exit('usage: python -m Runner.archive ARCHIVE OUTPUT.pgn|OUTPUT.json')
+    if sys.argv[2].endswith('.json'):
+        export_json(sys.argv[1], sys.argv[2])
+    else:
+        export_pgn(sys.argv[1], sys.argv[2])
@@ -0,0 +1,159 @@
+"""
+Headless game loop shared by the Interface and the worker processes.
+Nothing in here imports PyQt so it can be used on machines without a display.
+"""
+
+import copy
+import inspect
+import random
+import time
+import chess
+from Runner.instrumentation import MoveProfile
+from Runner.openings import book_move
+from Runner.results import GameResult
+from Runner.termination import GameTracker
+
+DRAW_TERMINATIONS = [chess.Termination.STALEMATE, chess.Termination.INSUFFICIENT_MATERIAL, chess.Termination.THREEFOLD_REPETITION,
+                     chess.Termination.FIFTY_MOVES, chess.Termination.SEVENTYFIVE_MOVES, chess.Termination.FIVEFOLD_REPETITION]
+TIME_FORFEIT = 'time_forfeit'
+ILLEGAL_MOVE = 'illegal_move'
+MAX_ILLEGAL_MOVES = 3 # times a bot is asked again after an illegal move before it forfeits
+MOVES_TO_GO = 30 # how many moves a per-game clock is assumed to still need to cover
+
+def game_context(bot):
+    """
+    Returns a copy of the bot for use in a single game, so that setting its side
+    doesn't interfere with other games being played by the same bot at the same time.
+    """
+    return copy.copy(bot)
+
+_takes_legal_moves = {} # bot class to whether its get_move accepts legal_moves
+
+def takes_legal_moves(bot):
+    """
+    Whether the bot's get_move accepts a legal_moves keyword argument. Checked once per class.
+    """
+    bot_class = type(bot)
+    if bot_class not in _takes_legal_moves:
+        try:
+            parameters = inspect.signature(bot.get_move).parameters.values()
+        except (TypeError, ValueError):
+            parameters = []
+        _takes_legal_moves[bot_class] = any(parameter.name == 'legal_moves' or parameter.kind == parameter.VAR_KEYWORD
+                                            for parameter in parameters)
+    return _takes_legal_moves[bot_class]
+
+def timed_move(bot, board, profile=None, legal_moves=None):
+    """
+    Gets a move from the bot, passing legal_moves along to bots whose get_move accepts it so they don't have to generate them again.
+    The call is recorded on profile if one is given.
+    """
+    if legal_moves is not None and takes_legal_moves(bot):
+        args, kwargs = (board,), {'legal_moves': legal_moves}
+    else:
+        args, kwargs = (board,), {}
+    if profile is None:
+        return bot.get_move(*args, **kwargs)
+    return profile.call(bot, bot.get_move, *args, **kwargs)
+
+def is_legal_move(board, move):
+    """
+    Checks a move returned by a bot without generating every legal move.
+    """
+    return isinstance(move, chess.Move) and board.is_legal(move)
+
+def move_deadline(start, move_time=None, time_left=None):
+    """
+    Works out when a bot has to have its move ready by, on the time.monotonic() clock.
+    A per-game clock is spread evenly over the moves it is expected to still have to make.
+    """
+    budget = move_time
+    if time_left is not None:
+        share = max(time_left, 0) / MOVES_TO_GO
+        budget = share if budget is None else min(budget, share)
+    if budget is None:
+        return None
+    return start + budget
+
+def play_game(bot1, bot2, bot1_white=None, move_time=None, game_time=None, seed=None, start_fen=None, instrument=False, profile=False,
+              adjudication=None):
+    """
+    Plays a single game between two bots, randomly assigning sides unless bot1_white is given.
+    The bots themselves are left untouched, each game uses its own copies.
+    If a seed is given the random module is seeded with it first, which makes games between bots that only
+    use the random module repeatable (as long as no other game runs on the same process at the same time).
+
+    move_time and game_time are time budgets in seconds per move and per bot per game. Before each move
+    the bot's deadline attribute is set to the time.monotonic() value it should return by, bots which search can use it to stop early.
+    A bot which uses up its whole game_time loses on time.
+    The game starts from start_fen if given. Bots with an opening book (see Runner.openings) play from it while they can.
+    Legal moves are generated once per ply and handed to bots whose get_move takes a legal_moves argument.
+    A bot which returns an illegal move is asked again, after MAX_ILLEGAL_MOVES illegal moves in a row it forfeits.
+    An Adjudication (see Runner.termination) can end lost or overlong games early.
+    With instrument=True every get_move call is timed and the counters bots report are kept (see Runner.instrumentation),
+    profile=True also runs them under cProfile.
+    Returns a GameResult.
+    """
+    if seed is not None:
+        random.seed(seed)
+    if bot1_white is None:
+        bot1_white = random.choice([True, False])
+
+    player1, player2 = game_context(bot1), game_context(bot2)
+    player1.side = chess.WHITE if bot1_white else chess.BLACK
+    player2.side = not player1.side
+
+    profiles = [None, None]
+    if instrument or profile:
+        profiles = [MoveProfile(bot1.name, profile), MoveProfile(bot2.name, profile)]
+
+    board = chess.Board(start_fen) if start_fen else chess.Board()
+    bot1_turn = bot1_white == (board.turn == chess.WHITE)
+    times = [0.0, 0.0]
+    moves = []
+    tracker = GameTracker(board, adjudication)
+    forfeit = None
+    while True:
+        legal_moves = list(board.legal_moves)
+        outcome = tracker.outcome(legal_moves)
+        if outcome is not None:
+            break
+
+        player = player1 if bot1_turn else player2
+        for _ in range(MAX_ILLEGAL_MOVES):
+            time_left = None if game_time is None else game_time - times[not bot1_turn]
+            start = time.monotonic()
+            player.deadline = move_deadline(start, move_time, time_left)
+            move = book_move(player, board) or timed_move(player, board, profiles[not bot1_turn], legal_moves)
+            times[not bot1_turn] += time.monotonic() - start
+            if game_time is not None and times[not bot1_turn] > game_time:
+                forfeit = TIME_FORFEIT
+                break
+            if is_legal_move(board, move):
+                break
+        else:
+            forfeit = ILLEGAL_MOVE
+        if forfeit is not None:
+            break
+
+        tracker.push(move)
+        moves.append(move.uci())
+        bot1_turn = not bot1_turn
+
+    if forfeit is not None:
+        winner = 'bot2' if bot1_turn else 'bot1'
+        termination = forfeit
+    else:
+        termination, winning_side = outcome
+        if winning_side is None:
+            winner = None
+        elif winning_side == player1.side:
+            winner = 'bot1'
+        else:
+            winner = 'bot2'
+
+    for move_profile in profiles:
+        if move_profile is not None:
+            move_profile.finish()
+    return GameResult(bot1.name, bot2.name, bot1_white, winner, termination, len(moves), tuple(moves), times[0], times[1], seed, start_fen,
+                      *profiles)
@@ -0,0 +1,201 @@
+"""
+Per-bot timing, counters and optional cProfile output, used to find which bot is slowing a batch of games down.
+Bots can report counters about their last move (nodes searched, transposition table hits, depth reached...)
+by defining a search_stats() method which returns a dict of numbers.
+"""
+
+import cProfile
+import io
+import pstats
+import sys
+import time
+from collections import Counter
+
+LATENCY_BUCKETS = [0.001, 0.003, 0.01, 0.03, 0.1, 0.3, 1, 3, 10] # upper edges in seconds, anything slower goes in a last bucket
+HISTOGRAM_WIDTH = 40
+
+def bot_counters(bot):
+    search_stats = getattr(bot, 'search_stats', None)
+    return search_stats() if search_stats is not None else {}
+
+def format_seconds(seconds):
+    if seconds < 1:
+        return f'{seconds * 1000:.3g}ms'
+    return f'{seconds:.3g}s'
+
+def percentile(values, fraction):
+    """
+    Nearest rank percentile of values, fraction being between 0 and 1. Also used by benchmark.py.
+    """
+    values = sorted(values)
+    return values[min(len(values) - 1, round(fraction * (len(values) - 1)))]
+
+class _LoadedStats:
+    """
+    Hands an already collected stats dict to pstats.Stats, which only accepts files or profiler-like objects.
+    """
+    def __init__(self, stats):
+        self.stats = dict(stats)
+
+    def create_stats(self):
+        pass
+
+class MoveProfile:
+    """
+    How long every get_move call of one bot took and the counters it reported, for a single game or folded over many with merge.
+    With profile=True each call also runs under cProfile. Python only allows one profiler per thread to run at a time
+    (one per process from 3.12), so profile games on worker processes rather than threads.
+    Profiles are picklable once finish has been called, which play_game does before returning them.
+    """
+    def __init__(self, name, profile=False):
+        self.name = name
+        self.times = [] # seconds per get_move call
+        self.counters = Counter() # totals of what the bot reported
+        self.counter_max = {}
+        self.profiler = cProfile.Profile() if profile else None
+        self.profile_stats = None # pstats dict once finished
+
+    def call(self, bot, get_move, *args, **kwargs):
+        """
+        Timing wrapper around a get_move call of the bot.
+        """
+        start = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.enable()
+        try:
+            move = get_move(*args, **kwargs)
+        finally:
+            if self.profiler is not None:
+                self.profiler.disable()
+        self.add(time.perf_counter() - start, bot_counters(bot))
+        return move
+
+    def add(self, seconds, counters=None):
+        self.times.append(seconds)
+        for key, value in (counters or {}).items():
+            self.counters[key] += value
+            self.counter_max[key] = max(self.counter_max.get(key, value), value)
+
+    def finish(self):
+        """
+        Turns the running profiler into plain stats so the profile can be pickled and merged.
+        """
+        if self.profiler is not None:
+            self.profiler.create_stats()
+            self.profile_stats = self.merge_stats(self.profile_stats, self.profiler.stats)
+            self.profiler = None
+        return self
+
+    @staticmethod
+    def merge_stats(stats, other):
+        if stats is None:
+            return other
+        if other is None:
+            return stats
+        merged = pstats.Stats(_LoadedStats(stats))
+        merged.add(_LoadedStats(other))
+        return merged.stats
+
+    def merge(self, other):
+        self.times.extend(other.times)
+        self.counters.update(other.counters)
+        for key, value in other.counter_max.items():
+            self.counter_max[key] = max(self.counter_max.get(key, value), value)
+        self.profile_stats = self.merge_stats(self.profile_stats, other.profile_stats)
+
+    def histogram(self):
+        """
+        Returns (upper edge, count) for each latency bucket, the last edge is None.
+        """
+        counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        for seconds in self.times:
+            bucket = 0
+            while bucket < len(LATENCY_BUCKETS) and seconds > LATENCY_BUCKETS[bucket]:
+                bucket += 1
+            counts[bucket] += 1
+        return list(zip(LATENCY_BUCKETS + [None], counts))
+
+    def summary(self):
+        """
+        Plain dict of the totals, suitable for JSON.
+        """
+        total = sum(self.times)
+        summary = {'name': self.name, 'moves': len(self.times), 'total_time': total}
+        if self.times:
+            summary.update({
+                'mean': total / len(self.times),
+                'p50': percentile(self.times, 0.5),
+                'p90': percentile(self.times, 0.9),
+                'p99': percentile(self.times, 0.99),
+                'max': max(self.times)
+            })
+        summary['counters'] = dict(self.counters)
+        if self.counters.get('nodes') and total:
+            summary['nodes_per_sec'] = self.counters['nodes'] / total
+        if self.counters.get('tt_probes'):
+            summary['tt_hit_rate'] = self.counters['tt_hits'] / self.counters['tt_probes']
+        return summary
+
+    def report(self, top=15):
+        summary = self.summary()
+        lines = [f"{self.name}: {summary['moves']} moves, {format_seconds(summary['total_time'])} in get_move"]
+        if not self.times:
+            return '\n'.join(lines)
+
+        lines.append('  latency ' + ', '.join(f'{key} {format_seconds(summary[key])}' for key in ('mean', 'p50', 'p90', 'p99', 'max')))
+        histogram = self.histogram()
+        most = max(count for _, count in histogram)
+        used = [bucket for bucket, (_, count) in enumerate(histogram) if count]
+        for bucket in range(used[0], used[-1] + 1): # empty buckets at either end are left out
+            edge, count = histogram[bucket]
+            lower = LATENCY_BUCKETS[bucket - 1] if bucket else 0
+            label = f'{format_seconds(lower)}-{format_seconds(edge)}' if edge is not None else f'>{format_seconds(lower)}'
+            bar = '#' * round(HISTOGRAM_WIDTH * count / most)
+            lines.append(f'  {label:>14} {count:>7} {bar}'.rstrip())
+
+        for key in sorted(self.counters):
+            lines.append(f'  {key}: {self.counters[key] / len(self.times):.4g} per move, max {self.counter_max[key]:.4g}')
+        if 'nodes_per_sec' in summary:
+            lines.append(f"  {summary['nodes_per_sec']:.0f} nodes/sec")
+        if 'tt_hit_rate' in summary:
+            lines.append(f"  transposition table hit rate {summary['tt_hit_rate']:.1%}")
+
+        if self.profile_stats:
+            output = io.StringIO()
+            stats = pstats.Stats(_LoadedStats(self.profile_stats), stream=output)
+            stats.sort_stats('cumulative').print_stats(top)
+            lines.append(output.getvalue().rstrip())
+        return '\n'.join(lines)
+
+SIDES = ('bot1', 'bot2')
+
+def side_names(bot1_name, bot2_name):
+    """
+    Names each side's profile is reported under, the side is added when both bots have the same name (e.g. self play).
+    """
+    if bot1_name == bot2_name:
+        return f'{bot1_name} (bot1)', f'{bot2_name} (bot2)'
+    return bot1_name, bot2_name
+
+def collect_profiles(profiles, result):
+    """
+    Folds the profiles of a GameResult into profiles, a dict of side ('bot1' or 'bot2') to MoveProfile.
+    Profiles are kept per side rather than per name so two bots which share a name aren't merged together.
+    """
+    names = side_names(result.bot1_name, result.bot2_name)
+    for side, name, profile in zip(SIDES, names, (result.bot1_profile, result.bot2_profile)):
+        if profile is None:
+            continue
+        if side not in profiles:
+            profiles[side] = MoveProfile(name)
+        profiles[side].merge(profile)
+    return profiles
+
+def print_profiles(profiles, top=15, file=None):
+    """
+    Prints the latency histogram, counters and (if profiled) the slowest functions of each bot, slowest bot first.
+    """
+    file = file or sys.stdout
+    for profile in sorted(profiles.values(), key=lambda profile: sum(profile.times), reverse=True):
+        print(profile.report(top), file=file)
+        print(file=file)
@@ -0,0 +1,121 @@
+"""
+Opening suites and books. Starting every game from the same position makes deterministic bots replay the same games,
+so play_games can instead start from a list of openings, each one played twice with the colours swapped.
+Bots can also be given a polyglot book which is looked up before they're asked for a move.
+"""
+
+import random
+import chess
+import chess.polyglot
+
+def load_openings(path):
+    """
+    Reads starting positions from a file with one FEN or EPD per line. Blank lines and lines starting with # are skipped.
+    """
+    openings = []
+    with open(path) as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split()
+            # a FEN has the halfmove clock and move number at the end, an EPD has operations (or nothing) instead
+            if len(parts) >= 6 and parts[4].isdigit() and parts[5].isdigit():
+                board = chess.Board(' '.join(parts[:6]))
+            else:
+                board, _ = chess.Board.from_epd(line)
+            openings.append(board.fen())
+    return openings
+
+def book_openings(book_path, count, plies=8, seed=None):
+    """
+    Generates up to count different starting positions by playing weighted random moves from a polyglot book,
+    for up to plies moves or until the book runs out.
+    """
+    rng = random.Random(seed)
+    openings = []
+    seen = set()
+    with chess.polyglot.open_reader(book_path) as reader:
+        for _ in range(count * 10): # give up eventually if the book is too small for count different positions
+            board = chess.Board()
+            for _ in range(plies):
+                try:
+                    board.push(reader.weighted_choice(board, random=rng).move)
+                except IndexError: # out of book
+                    break
+            fen = board.fen()
+            if board.move_stack and fen not in seen:
+                seen.add(fen)
+                openings.append(fen)
+                if len(openings) == count:
+                    break
+    return openings
+
+def opening_suite(openings, count=100, plies=8, seed=None):
+    """
+    Turns whatever was passed as openings into a list of FENs: a list is returned as it is, a path ending in .bin
+    is treated as a polyglot book (see book_openings), any other path as a FEN/EPD file.
+    """
+    if openings is None or isinstance(openings, (list, tuple)):
+        return openings
+    if str(openings).endswith('.bin'):
+        return book_openings(openings, count, plies, seed)
+    return load_openings(openings)
+
+def opening_for_game(openings, game):
+    """
+    The starting FEN and whether bot1 plays white for the given game number. Games come in pairs which
+    play the same opening with the colours swapped. Without openings colours are left to chance.
+    """
+    if not openings:
+        return None, None
+    return openings[(game // 2) % len(openings)], game % 2 == 0
+
+class OpeningBook:
+    """
+    Polyglot opening book for bots. Set it as a bot's book attribute (bot.book = OpeningBook('book.bin')) and the game loop
+    plays a move from the book whenever it has one, only asking the bot for a move once the book runs out.
+    Moves are picked at random weighted by the book, or always the most played move if best is True.
+    The book file is opened on first use so bots with a book can still be sent to worker processes.
+    """
+    def __init__(self, path, best=False, max_ply=None):
+        self.path = path
+        self.best = best
+        self.max_ply = max_ply
+        self.reader = None
+        self.hits = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['reader'] = None
+        return state
+
+    def __deepcopy__(self, memo):
+        # copies share the open file, entries are only ever read
+        return self
+
+    def lookup(self, board):
+        if self.max_ply is not None and board.ply() >= self.max_ply:
+            return None
+        if self.reader is None:
+            self.reader = chess.polyglot.open_reader(self.path)
+        try:
+            entry = self.reader.find(board) if self.best else self.reader.weighted_choice(board)
+        except IndexError: # position isn't in the book
+            return None
+        self.hits += 1
+        return entry.move
+
+    def close(self):
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+
+def book_move(bot, board):
+    """
+    Move from the bot's opening book if it has one and the position is in it, else None.
+    """
+    book = getattr(bot, 'book', None)
+    if book is None:
+        return None
+    return book.lookup(board)
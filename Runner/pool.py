@@ -0,0 +1,158 @@
+"""
+Match runner which plays many games at once, either on threads or on worker processes.
+Bots are pure Python so threads end up fighting over the GIL, with processes each game is played
+in its own worker and only the result is sent back.
+"""
+
+import ast
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from Runner.game import play_game
+from Runner.openings import opening_for_game, opening_suite
+
+class BotFactory:
+    """
+    Picklable recipe which builds a fresh bot inside a worker process.
+    Either pass a bot class (or any picklable callable) along with its arguments, e.g. BotFactory(nMoveBasicEvalBot, 2),
+    or pass an existing bot which is then used as a prototype and copied for every game.
+    If book is set to an OpeningBook it is given to every bot which gets built.
+    """
+    def __init__(self, bot, *args, **kwargs):
+        self.bot = bot
+        self.args = args
+        self.kwargs = kwargs
+        self.book = None
+
+    def __call__(self):
+        if hasattr(self.bot, 'get_move') and not isinstance(self.bot, type):
+            bot = copy.deepcopy(self.bot)
+        else:
+            bot = self.bot(*self.args, **self.kwargs)
+        if self.book is not None:
+            bot.book = self.book
+        return bot
+
+def as_factory(bot):
+    """
+    Wraps bots, bot classes and other callables in a BotFactory unless they already are one.
+    """
+    if isinstance(bot, BotFactory):
+        return bot
+    return BotFactory(bot)
+
+def as_bot(bot):
+    """
+    Builds a bot from bot classes and factories, bots are returned as they are.
+    """
+    if isinstance(bot, (BotFactory, type)):
+        return as_factory(bot)()
+    return bot
+
+def parse_bot_spec(spec, allow_gui=True):
+    """
+    Turns a bot spec such as 'RandomBot', 'nMoveBasicEvalBot(2)' or 'AlphaBetaBot(depth=5)' into a BotFactory.
+    Arguments are Python literals, bots are looked up by name in Bots.registry so only the selected bot's module gets imported.
+    allow_gui=False rejects bots which can only be played through the GUI.
+    """
+    from Bots.registry import is_gui_bot, load_bot
+
+    name, _, arguments = spec.strip().partition('(')
+    name = name.strip()
+    if not allow_gui and is_gui_bot(name):
+        raise ValueError(f'{name} can only be played through the GUI')
+    bot_class = load_bot(name)
+
+    args, kwargs = [], {}
+    arguments = arguments.rstrip()
+    if '(' in spec:
+        # only the call's own closing bracket is removed, arguments can have brackets of their own
+        if not arguments.endswith(')'):
+            raise ValueError(f'Missing closing bracket in bot spec: {spec}')
+        arguments = arguments[:-1]
+    if arguments.strip():
+        try:
+            call = ast.parse(f'f({arguments})', mode='eval').body
+        except SyntaxError as e:
+            raise ValueError(f'Invalid bot spec: {spec} ({e.msg})') from e
+        try:
+            args = [ast.literal_eval(arg) for arg in call.args]
+            kwargs = {keyword.arg: ast.literal_eval(keyword.value) for keyword in call.keywords}
+        except ValueError as e:
+            raise ValueError(f'Bot spec arguments have to be Python literals: {spec}') from e
+    return BotFactory(bot_class, *args, **kwargs)
+
+def _play_factory_game(factory1, factory2, bot1_white, move_time, game_time, seed, start_fen, instrument, profile, adjudication):
+    return play_game(factory1(), factory2(), bot1_white, move_time, game_time, seed, start_fen, instrument, profile, adjudication)
+
+class GamePool:
+    """
+    Threads or worker processes which games can be submitted to, use as a context manager.
+    Keeping one pool around lets something like a tournament reuse the same workers for every round.
+    With use_processes=True bots can be bots, bot classes or BotFactory instances and every game gets freshly built bots,
+    otherwise bots are shared between threads with each game playing with its own copies.
+    move_time, game_time, instrument, profile and adjudication are passed on to play_game.
+    """
+    def __init__(self, workers=None, use_processes=False, move_time=None, game_time=None, instrument=False, profile=False,
+                 adjudication=None):
+        self.use_processes = use_processes
+        self.move_time = move_time
+        self.game_time = game_time
+        self.instrument = instrument
+        self.profile = profile
+        self.adjudication = adjudication
+        if use_processes:
+            self.workers = workers or os.cpu_count() or 1
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            # same default as ThreadPoolExecutor
+            self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+            self.executor = ThreadPoolExecutor(max_workers=self.workers)
+
+    def submit(self, bot1, bot2, bot1_white=None, seed=None, start_fen=None):
+        """
+        Starts a game and returns a Future for its GameResult.
+        """
+        if self.use_processes:
+            return self.executor.submit(_play_factory_game, as_factory(bot1), as_factory(bot2), bot1_white,
+                                        self.move_time, self.game_time, seed, start_fen, self.instrument, self.profile,
+                                        self.adjudication)
+        return self.executor.submit(play_game, as_bot(bot1), as_bot(bot2), bot1_white, self.move_time, self.game_time, seed, start_fen,
+                                    self.instrument, self.profile, self.adjudication)
+
+    def shutdown(self, cancel=False):
+        self.executor.shutdown(wait=True, cancel_futures=cancel)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+def iter_games(games, bot1, bot2, workers=None, use_processes=False, move_time=None, game_time=None, seed=None, openings=None,
+               instrument=False, profile=False, adjudication=None):
+    """
+    Plays the given number of games and yields a GameResult for each one as soon as it finishes.
+    See GamePool for what bot1 and bot2 can be. If seed is given, game i is played with seed + i.
+    openings is a list of starting FENs, or a FEN/EPD file or polyglot book (see Runner.openings.opening_suite).
+    Each opening is played twice with the colours swapped.
+    With instrument or profile set each result carries a MoveProfile per bot (see Runner.instrumentation).
+    adjudication is a Runner.termination.Adjudication which ends hopeless or overlong games early.
+    """
+    if use_processes:
+        # wrap the bots once here rather than on every submit, the executor still pickles them again for each game
+        bot1, bot2 = as_factory(bot1), as_factory(bot2)
+    openings = opening_suite(openings, (games + 1) // 2, seed=seed)
+
+    with GamePool(workers, use_processes, move_time, game_time, instrument, profile, adjudication) as pool:
+        futures = []
+        for game in range(games):
+            start_fen, bot1_white = opening_for_game(openings, game)
+            futures.append(pool.submit(bot1, bot2, bot1_white, None if seed is None else seed + game, start_fen))
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # if the caller stops early don't wait on games which haven't started yet
+            for future in futures:
+                future.cancel()
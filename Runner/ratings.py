@@ -0,0 +1,191 @@
+"""
+Ratings from a set of game results.
+
+elo_ratings fits the usual logistic Elo model by maximum likelihood, counting a draw as half a win and half a loss.
+bayes_elo_ratings follows the model used by Remi Coulom's BayesElo: draws are a third outcome controlled by a draw_elo
+parameter (fitted along with the ratings) and every player gets some virtual draws against an average opponent as a prior,
+which keeps the ratings of players who won or lost every game finite.
+
+Both take a list of (player_a, player_b, score_a) tuples, where score_a is 1, 0.5 or 0 from player_a's point of view,
+and return a list of Rating tuples sorted best first. Ratings are relative, the average is 0.
+"""
+
+import math
+from collections import defaultdict, namedtuple
+
+Rating = namedtuple('Rating', ['name', 'rating', 'error', 'games', 'score']) # error is the 95% confidence interval (+/-)
+
+LOG10_SCALE = math.log(10) / 400 # d/dx of the logistic curve in Elo units
+Z_95 = 1.96
+MAX_DRAW_ELO = 400 # with almost nothing but draws the fitted draw_elo would grow without limit
+
+def expected_score(difference):
+    """
+    Chance of winning for a player rated difference Elo above their opponent.
+    """
+    return 1 / (1 + 10 ** (-difference / 400))
+
+def elo_difference(score):
+    """
+    Elo difference corresponding to a score fraction, e.g. 0.75 -> about 191.
+    """
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+def _tally(games):
+    """
+    Counts wins, draws and losses for every pair of players.
+    """
+    players = []
+    pairs = defaultdict(lambda: [0, 0, 0]) # (a, b) -> [a wins, draws, b wins]
+    for player_a, player_b, score in games:
+        for player in (player_a, player_b):
+            if player not in players:
+                players.append(player)
+        key = (player_a, player_b)
+        if score == 1:
+            pairs[key][0] += 1
+        elif score == 0:
+            pairs[key][2] += 1
+        else:
+            pairs[key][1] += 1
+    return players, pairs
+
+def _summary(players, pairs, ratings, curvature):
+    games = defaultdict(int)
+    points = defaultdict(float)
+    for (player_a, player_b), (wins, draws, losses) in pairs.items():
+        total = wins + draws + losses
+        games[player_a] += total
+        games[player_b] += total
+        points[player_a] += wins + draws / 2
+        points[player_b] += losses + draws / 2
+
+    results = []
+    for player in players:
+        error = Z_95 / math.sqrt(curvature[player]) if curvature[player] > 0 else float('inf')
+        score = points[player] / games[player] if games[player] else 0.0
+        results.append(Rating(player, ratings[player], error, games[player], score))
+    return sorted(results, key=lambda rating: rating.rating, reverse=True)
+
+def _centre(players, ratings):
+    average = sum(ratings.values()) / len(players)
+    for player in players:
+        ratings[player] -= average
+
+def elo_ratings(games, iterations=1000, tolerance=0.01):
+    """
+    Maximum likelihood Elo ratings. A player who won (or lost) every game would drift off forever,
+    so each player is also given one virtual draw against an average opponent.
+    """
+    players, pairs = _tally(games)
+    ratings = {player: 0.0 for player in players}
+    for _ in range(iterations):
+        gradient = {player: 0.0 for player in players}
+        curvature = {player: 0.0 for player in players}
+        for player in players:
+            # the virtual draw against a 0 rated opponent
+            expected = expected_score(ratings[player])
+            gradient[player] += LOG10_SCALE * (0.5 - expected)
+            curvature[player] += LOG10_SCALE ** 2 * expected * (1 - expected)
+        for (player_a, player_b), (wins, draws, losses) in pairs.items():
+            total = wins + draws + losses
+            expected = expected_score(ratings[player_a] - ratings[player_b])
+            step = LOG10_SCALE * (wins + draws / 2 - total * expected)
+            gradient[player_a] += step
+            gradient[player_b] -= step
+            information = LOG10_SCALE ** 2 * total * expected * (1 - expected)
+            curvature[player_a] += information
+            curvature[player_b] += information
+
+        change = 0.0
+        for player in players:
+            delta = gradient[player] / curvature[player]
+            ratings[player] += delta
+            change = max(change, abs(delta))
+        _centre(players, ratings)
+        if change < tolerance:
+            break
+
+    return _summary(players, pairs, ratings, curvature)
+
+def _outcome_terms(difference, draw_elo):
+    """
+    Probabilities of a win, draw and loss for a player rated difference above their opponent under the BayesElo model.
+    """
+    win = expected_score(difference - draw_elo)
+    loss = expected_score(-difference - draw_elo)
+    return win, max(1 - win - loss, 1e-12), loss
+
+def _bayes_log_likelihood(players, pairs, ratings, draw_elo, prior):
+    total = 0.0
+    for (player_a, player_b), (wins, draws, losses) in pairs.items():
+        win, draw, loss = _outcome_terms(ratings[player_a] - ratings[player_b], draw_elo)
+        total += wins * math.log(win) + draws * math.log(draw) + losses * math.log(loss)
+    for player in players:
+        _, draw, _ = _outcome_terms(ratings[player], draw_elo)
+        total += prior * math.log(draw)
+    return total
+
+def bayes_elo_ratings(games, prior=2, draw_elo=None, iterations=500, tolerance=0.01):
+    """
+    BayesElo style ratings. prior is the number of virtual draws each player gets against an average opponent.
+    If draw_elo isn't given it is estimated from the games.
+    """
+    players, pairs = _tally(games)
+    ratings = {player: 0.0 for player in players}
+    fit_draw_elo = draw_elo is None
+    if fit_draw_elo:
+        draw_elo = 97.3 # BayesElo's default
+    epsilon = 0.5
+
+    def likelihood():
+        return _bayes_log_likelihood(players, pairs, ratings, draw_elo, prior)
+
+    for _ in range(iterations):
+        change = 0.0
+        # Newton steps one parameter at a time, with numerical derivatives
+        for player in players:
+            original = ratings[player]
+            centre = likelihood()
+            ratings[player] = original + epsilon
+            above = likelihood()
+            ratings[player] = original - epsilon
+            below = likelihood()
+            first = (above - below) / (2 * epsilon)
+            second = (above - 2 * centre + below) / epsilon ** 2
+            delta = -first / second if second < 0 else 0.0
+            delta = max(-200.0, min(200.0, delta))
+            ratings[player] = original + delta
+            change = max(change, abs(delta))
+        _centre(players, ratings)
+
+        if fit_draw_elo:
+            original = draw_elo
+            centre = likelihood()
+            draw_elo = original + epsilon
+            above = likelihood()
+            draw_elo = original - epsilon
+            below = likelihood()
+            first = (above - below) / (2 * epsilon)
+            second = (above - 2 * centre + below) / epsilon ** 2
+            delta = -first / second if second < 0 else 0.0
+            draw_elo = max(0.0, min(MAX_DRAW_ELO, original + max(-200.0, min(200.0, delta))))
+
+        if change < tolerance:
+            break
+
+    # the curvature of the log likelihood around each rating gives its standard error
+    curvature = {}
+    for player in players:
+        original = ratings[player]
+        centre = likelihood()
+        ratings[player] = original + epsilon
+        above = likelihood()
+        ratings[player] = original - epsilon
+        below = likelihood()
+        ratings[player] = original
+        curvature[player] = -(above - 2 * centre + below) / epsilon ** 2
+
+    results = _summary(players, pairs, ratings, curvature)
+    return results, draw_elo
@@ -0,0 +1,75 @@
+"""
+Records games from the headless paths (play_games, run_knockout, simulate.py) without slowing them down.
+Finished games are handed to a background thread which writes them to an archive in batches.
+"""
+
+import queue
+import threading
+from Runner.archive import ArchiveWriter
+
+class BatchRecorder:
+    """
+    Queues finished games and writes them to a game archive (see Runner.archive) from a background thread,
+    batch_size games at a time. At most max_pending games are held in memory, if the writer falls that far behind
+    record() waits for it to catch up rather than letting the queue grow without limit.
+    Use as a context manager or call close() to write out the remaining games.
+    """
+    def __init__(self, path, batch_size=256, max_pending=4096):
+        self.path = path
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.recorded = 0
+        self.error = None
+        self.closed = False
+        self.thread = threading.Thread(target=self.write_loop, name='BatchRecorder', daemon=True)
+        self.thread.start()
+
+    def record(self, result):
+        if self.error is not None:
+            raise RuntimeError(f'Recording to {self.path} failed') from self.error
+        self.queue.put(result)
+
+    def write_loop(self):
+        batch = []
+        try:
+            with ArchiveWriter(self.path) as archive:
+                done = False
+                while not done:
+                    # wait for one game then take whatever else is already queued, up to a batch
+                    batch = [self.queue.get()]
+                    while len(batch) < self.batch_size:
+                        try:
+                            batch.append(self.queue.get_nowait())
+                        except queue.Empty:
+                            break
+
+                    for result in batch:
+                        if result is None: # close() was called
+                            done = True
+                            break
+                        archive.add(result)
+                        self.recorded += 1
+                    archive.flush()
+        except Exception as error:
+            self.error = error
+            # keep draining so record() never blocks on a dead writer, unless close() has already been
+            # called, in which case nothing else is coming and waiting for it would hang close()
+            if any(result is None for result in batch):
+                return
+            while self.queue.get() is not None:
+                pass
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise RuntimeError(f'Recording to {self.path} failed') from self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
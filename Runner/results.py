@@ -0,0 +1,63 @@
+"""
+Per-game result records and the aggregator which folds them together.
+Results are immutable so they can be passed between threads and processes without any locking.
+"""
+
+from collections import Counter, namedtuple
+
+GameResult = namedtuple('GameResult', [
+    'bot1_name',    # names at the time the game was played
+    'bot2_name',
+    'bot1_white',   # True if bot1 played white
+    'winner',       # 'bot1', 'bot2' or None for a draw
+    'termination',  # lowercase chess.Termination name, e.g. 'checkmate'
+    'plies',
+    'moves',        # tuple of moves in UCI format
+    'bot1_time',    # seconds spent inside bot1.get_move
+    'bot2_time',
+    'seed',         # seed the random module was given before the game, None if it wasn't
+    'start_fen',    # position the game started from, None for the standard starting position
+    'bot1_profile', # MoveProfile of each bot's get_move calls when the game was instrumented, otherwise None
+    'bot2_profile',
+], defaults=(None, None))
+
+class MatchStats:
+    """
+    Folds GameResults together into totals for a match between two bots.
+    """
+    def __init__(self, bot1_name, bot2_name):
+        self.bot1_name = bot1_name
+        self.bot2_name = bot2_name
+        self.games = 0
+        self.bot1_wins = 0
+        self.bot2_wins = 0
+        self.draws = 0
+        self.plies = 0
+        self.bot1_time = 0.0
+        self.bot2_time = 0.0
+        self.terminations = Counter()
+
+    def add(self, result):
+        self.games += 1
+        if result.winner == 'bot1':
+            self.bot1_wins += 1
+        elif result.winner == 'bot2':
+            self.bot2_wins += 1
+        else:
+            self.draws += 1
+        self.plies += result.plies
+        self.bot1_time += result.bot1_time
+        self.bot2_time += result.bot2_time
+        self.terminations[result.termination] += 1
+
+    def apply(self, bot1, bot2):
+        """
+        Adds the totals onto the wins/losses/draws counters of the bots.
+        Should only be called from one thread once the games are finished.
+        """
+        bot1.wins += self.bot1_wins
+        bot1.losses += self.bot2_wins
+        bot1.draws += self.draws
+        bot2.wins += self.bot2_wins
+        bot2.losses += self.bot1_wins
+        bot2.draws += self.draws
@@ -0,0 +1,128 @@
+"""
+Sequential probability ratio test for bot matches. Rather than playing a fixed number of games, games are played until
+there is enough evidence to decide between two hypotheses about the Elo difference between the bots:
+H0: bot1 is elo0 stronger than bot2, H1: bot1 is elo1 stronger. alpha and beta are the chances of wrongly
+accepting H1 and H0. Uses the same normal approximation of the log likelihood ratio as fishtest.
+"""
+
+import math
+from concurrent.futures import FIRST_COMPLETED, wait
+from Runner.openings import opening_for_game, opening_suite
+from Runner.pool import GamePool, as_factory
+from Runner.ratings import elo_difference, expected_score
+
+H0 = 'H0'
+H1 = 'H1'
+PRIOR = 0.5
+
+class SPRT:
+    """
+    Keeps track of the wins, draws and losses of bot1 and works out the log likelihood ratio (LLR) of H1 over H0.
+    """
+    def __init__(self, elo0=0, elo1=10, alpha=0.05, beta=0.05):
+        if elo1 <= elo0:
+            raise ValueError('elo1 has to be larger than elo0')
+        self.elo0 = elo0
+        self.elo1 = elo1
+        self.alpha = alpha
+        self.beta = beta
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+
+    def add(self, result):
+        if result.winner == 'bot1':
+            self.wins += 1
+        elif result.winner == 'bot2':
+            self.losses += 1
+        else:
+            self.draws += 1
+
+    @property
+    def games(self):
+        return self.wins + self.draws + self.losses
+
+    def llr(self):
+        if not self.games:
+            return 0.0
+        # half a game of each result as a prior, otherwise the first few games (all draws, say) would have no variance
+        # and decide the test on their own
+        wins, draws, losses = (count + PRIOR for count in (self.wins, self.draws, self.losses))
+        games = wins + draws + losses
+        score = (wins + draws / 2) / games
+        variance = (wins + draws / 4) / games - score ** 2
+        score0 = expected_score(self.elo0)
+        score1 = expected_score(self.elo1)
+        return games * (score1 - score0) * (2 * score - score0 - score1) / (2 * variance)
+
+    def decision(self):
+        """
+        H1 or H0 once one of them has been accepted, else None.
+        """
+        llr = self.llr()
+        if llr >= self.upper:
+            return H1
+        if llr <= self.lower:
+            return H0
+        return None
+
+    def elo(self):
+        """
+        Elo difference implied by the score so far.
+        """
+        if not self.games:
+            return 0.0
+        return elo_difference((self.wins + self.draws / 2) / self.games)
+
+    def summary(self):
+        decision = self.decision()
+        status = {H1: f'H1 accepted (elo >= {self.elo1})', H0: f'H0 accepted (elo <= {self.elo0})', None: 'undecided'}[decision]
+        return (f'SPRT [{self.elo0}, {self.elo1}] alpha={self.alpha} beta={self.beta}: {status}\n'
+                f'LLR {self.llr():.2f} (bounds {self.lower:.2f}, {self.upper:.2f}) after {self.games} games '
+                f'(+{self.wins} ={self.draws} -{self.losses}, elo {self.elo():+.1f})')
+
+def run_sprt(bot1, bot2, elo0=0, elo1=10, alpha=0.05, beta=0.05, max_games=10000, workers=None, use_processes=True,
+             move_time=None, game_time=None, seed=None, on_game=None, openings=None, instrument=False, profile=False,
+             adjudication=None):
+    """
+    Plays games between the bots until the test comes to a decision or max_games have been played, keeping every worker busy.
+    Colours alternate between games, if openings are given (see Runner.openings.opening_suite) each one is played by both colours.
+    on_game is called with every GameResult as it finishes, with instrument or profile set the results carry MoveProfiles.
+    adjudication (see Runner.termination) ends hopeless or overlong games early.
+    Returns the SPRT.
+    """
+    sprt = SPRT(elo0, elo1, alpha, beta)
+    if use_processes:
+        bot1, bot2 = as_factory(bot1), as_factory(bot2)
+
+    openings = opening_suite(openings, seed=seed)
+
+    with GamePool(workers, use_processes, move_time, game_time, instrument, profile, adjudication) as pool:
+        started = 0
+        running = set()
+
+        def start_games():
+            nonlocal started
+            while len(running) < pool.workers and started < max_games:
+                start_fen, _ = opening_for_game(openings, started)
+                running.add(pool.submit(bot1, bot2, started % 2 == 0, None if seed is None else seed + started, start_fen))
+                started += 1
+
+        start_games()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                running.remove(future)
+                result = future.result()
+                sprt.add(result)
+                if on_game is not None:
+                    on_game(result)
+            if sprt.decision() is not None:
+                # games which are still being played are dropped
+                for future in running:
+                    future.cancel()
+                break
+            start_games()
+    return sprt
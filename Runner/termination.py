@@ -0,0 +1,101 @@
+"""
+Incremental game over detection for the headless game loop, plus optional adjudication of hopeless or endless games.
+board.is_game_over() and board.outcome() generate every legal move and replay the move stack to look for repetitions
+on every call, here the legal moves already generated for the bot are reused and the rest is tracked as moves are pushed.
+"""
+
+from collections import Counter
+import chess
+from Bots.evaluation import PIECE_VALUES, material
+
+ADJUDICATED_RESIGN = 'adjudicated_resign'
+ADJUDICATED_DRAW = 'adjudicated_draw'
+
+def repetition_key(board):
+    """
+    Same fields python-chess compares when looking for repetitions, the en passant square only counts if it can actually be taken.
+    """
+    ep_square = board.ep_square if board.ep_square is not None and board.has_legal_en_passant() else None
+    return (board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings,
+            board.occupied_co[chess.WHITE], board.occupied_co[chess.BLACK], board.turn, board.clean_castling_rights(), ep_square)
+
+class Adjudication:
+    """
+    Ends games early once the result is clear. A side which is resign_material or more pawns behind
+    for resign_plies plies in a row resigns, and games still going after max_plies plies are drawn.
+    Either rule is off when left as None.
+    """
+    def __init__(self, resign_material=None, resign_plies=10, max_plies=None):
+        self.resign_material = resign_material
+        self.resign_plies = resign_plies
+        self.max_plies = max_plies
+
+class GameTracker:
+    """
+    Follows a game and works out whether it is over after each move, giving the same result as board.outcome().
+    Moves have to be made through push so the repetition counts stay in step with the board.
+    Repetitions are counted in a dict of position keys which is cleared on every irreversible move,
+    and insufficient material is only checked again after captures and promotions.
+    """
+    def __init__(self, board, adjudication=None):
+        self.board = board
+        self.adjudication = adjudication
+        self.key = repetition_key(board)
+        self.repetitions = Counter({self.key: 1})
+        self.insufficient_material = board.is_insufficient_material()
+        self.losing_plies = 0 # plies in a row the same side has been far enough behind to resign
+        self.losing_side = None
+        self.plies = 0
+
+    def push(self, move):
+        board = self.board
+        material_changes = board.is_capture(move) or move.promotion is not None
+        castling_rights = board.castling_rights
+        board.push(move)
+        self.plies += 1
+
+        if board.halfmove_clock == 0 or board.castling_rights != castling_rights:
+            # positions from before an irreversible move can't come up again
+            self.repetitions.clear()
+        self.key = repetition_key(board)
+        self.repetitions[self.key] += 1
+        if material_changes:
+            self.insufficient_material = board.is_insufficient_material()
+        if self.adjudication is not None and self.adjudication.resign_material is not None:
+            self.update_resign_count()
+
+    def update_resign_count(self):
+        white_sum, black_sum = material(self.board, PIECE_VALUES)
+        if abs(white_sum - black_sum) < self.adjudication.resign_material:
+            self.losing_plies = 0
+            return
+        losing_side = chess.WHITE if white_sum < black_sum else chess.BLACK
+        if losing_side != self.losing_side:
+            self.losing_side = losing_side
+            self.losing_plies = 0
+        self.losing_plies += 1
+
+    def outcome(self, legal_moves):
+        """
+        Returns (termination, winner) if the game is over, otherwise None. legal_moves are the legal moves of the current position.
+        termination is the lowercase chess.Termination name or one of the adjudications, winner a colour or None for a draw.
+        """
+        board = self.board
+        if not legal_moves and board.is_check():
+            return 'checkmate', not board.turn
+        if self.insufficient_material:
+            return 'insufficient_material', None
+        if not legal_moves:
+            return 'stalemate', None
+        if board.halfmove_clock >= 150:
+            return 'seventyfive_moves', None
+        if self.repetitions[self.key] >= 5:
+            return 'fivefold_repetition', None
+
+        adjudication = self.adjudication
+        if adjudication is not None:
+            if adjudication.resign_material is not None and self.losing_plies >= adjudication.resign_plies:
+                return ADJUDICATED_RESIGN, not self.losing_side
+            if adjudication.max_plies is not None and self.plies >= adjudication.max_plies:
+                return ADJUDICATED_DRAW, None
+        return None
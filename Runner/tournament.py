@@ -0,0 +1,207 @@
+"""
+Tournaments between any number of bots in round robin, Swiss or knockout format.
+All the games of a round are independent of each other so they are played at the same time on a GamePool,
+and at the end the bots are rated with Elo and BayesElo (see Runner.ratings).
+"""
+
+import math
+import random
+from concurrent.futures import as_completed
+from Runner.openings import opening_for_game, opening_suite
+from Runner.pool import GamePool, as_bot
+from Runner.ratings import Rating, bayes_elo_ratings, elo_ratings
+
+ROUND_ROBIN = 'round_robin'
+SWISS = 'swiss'
+KNOCKOUT = 'knockout'
+FORMATS = [ROUND_ROBIN, SWISS, KNOCKOUT]
+
+class Tournament:
+    """
+    Plays a tournament between bots, which can be bots, bot classes or BotFactory instances (the latter two are needed to use processes).
+    Every pairing plays games_per_pairing games with the colours alternating, starting from openings if given
+    (a list of FENs, or a FEN/EPD file or polyglot book, see Runner.openings.opening_suite) with each opening played by both colours.
+    Swiss tournaments last rounds rounds (by default enough to find a clear winner), in a knockout a tied pairing keeps playing
+    pairs of games until someone is ahead, or max_tiebreaks pairs have been played after which a coin is flipped.
+    The rest of the arguments are passed on to the GamePool, and games are recorded if a BatchRecorder is given.
+    """
+    def __init__(self, bots, format=ROUND_ROBIN, games_per_pairing=2, rounds=None, max_tiebreaks=5, workers=None,
+                 use_processes=True, move_time=None, game_time=None, seed=None, recorder=None, openings=None, adjudication=None):
+        if format not in FORMATS:
+            raise ValueError(f'Unknown tournament format: {format}')
+        if len(bots) < 2:
+            raise ValueError('A tournament needs at least two bots')
+        self.bots = list(bots)
+        self.names = self.unique_names([as_bot(bot).name for bot in self.bots])
+        self.format = format
+        self.games_per_pairing = games_per_pairing
+        self.rounds = rounds
+        self.max_tiebreaks = max_tiebreaks
+        self.pool_options = (workers, use_processes, move_time, game_time, False, False, adjudication)
+        self.random = random.Random(seed)
+        self.recorder = recorder
+        self.openings = opening_suite(openings, seed=seed)
+        self.games_started = 0
+        self.games = [] # (name of player a, name of player b, score of a)
+        self.points = [0.0] * len(self.bots)
+        self.opponents = [set() for _ in self.bots]
+        self.placements = [] # knockout only, first eliminated first
+
+    @staticmethod
+    def unique_names(names):
+        seen = {}
+        unique = []
+        for name in names:
+            seen[name] = seen.get(name, 0) + 1
+            unique.append(name if names.count(name) == 1 else f'{name} #{seen[name]}')
+        return unique
+
+    def play_round(self, pool, pairings, games_per_pairing=None):
+        """
+        Plays every pairing of a round at the same time. Returns the points each pairing's first player scored.
+        """
+        if games_per_pairing is None:
+            games_per_pairing = self.games_per_pairing
+        futures = {}
+        for pairing, (player_a, player_b) in enumerate(pairings):
+            self.opponents[player_a].add(player_b)
+            self.opponents[player_b].add(player_a)
+            for game in range(games_per_pairing):
+                start_fen, bot1_white = opening_for_game(self.openings, self.games_started)
+                if bot1_white is None:
+                    bot1_white = game % 2 == 0
+                self.games_started += 1
+                future = pool.submit(self.bots[player_a], self.bots[player_b], bot1_white, self.random.getrandbits(32), start_fen)
+                futures[future] = pairing
+
+        scores = [0.0] * len(pairings)
+        for future in as_completed(futures):
+            result = future.result()
+            pairing = futures[future]
+            player_a, player_b = pairings[pairing]
+            score = {'bot1': 1.0, 'bot2': 0.0, None: 0.5}[result.winner]
+            scores[pairing] += score
+            self.points[player_a] += score
+            self.points[player_b] += 1 - score
+            self.games.append((self.names[player_a], self.names[player_b], score))
+            if self.recorder is not None:
+                self.recorder.record(result._replace(bot1_name=self.names[player_a], bot2_name=self.names[player_b]))
+        return scores
+
+    def run(self):
+        with GamePool(*self.pool_options) as pool:
+            if self.format == ROUND_ROBIN:
+                self.run_round_robin(pool)
+            elif self.format == SWISS:
+                self.run_swiss(pool)
+            else:
+                self.run_knockout(pool)
+        return self.standings()
+
+    def run_round_robin(self, pool):
+        # every pairing is independent so the whole tournament is one round
+        players = range(len(self.bots))
+        self.play_round(pool, [(a, b) for a in players for b in players if a < b])
+
+    def run_swiss(self, pool):
+        rounds = self.rounds or math.ceil(math.log2(len(self.bots)))
+        for _ in range(rounds):
+            self.play_round(pool, self.swiss_pairings())
+
+    def swiss_pairings(self):
+        """
+        Pairs players with similar scores who haven't met yet where possible. With an odd number of players
+        the lowest scoring player who hasn't had a bye sits out, and gets the points for a win.
+        """
+        order = list(range(len(self.bots)))
+        self.random.shuffle(order)
+        order.sort(key=lambda player: self.points[player], reverse=True)
+
+        if len(order) % 2:
+            bye = next((player for player in reversed(order) if None not in self.opponents[player]), order[-1])
+            order.remove(bye)
+            self.opponents[bye].add(None)
+            self.points[bye] += self.games_per_pairing
+
+        pairings = []
+        while order:
+            player = order.pop(0)
+            opponent = next((other for other in order if other not in self.opponents[player]), order[0])
+            order.remove(opponent)
+            pairings.append((player, opponent))
+        return pairings
+
+    def run_knockout(self, pool):
+        remaining = list(range(len(self.bots)))
+        self.random.shuffle(remaining)
+        while len(remaining) > 1:
+            advancing = [remaining.pop()] if len(remaining) % 2 else []
+            pairings = [(remaining[i], remaining[i + 1]) for i in range(0, len(remaining), 2)]
+            scores = self.play_round(pool, pairings)
+
+            # keep playing pairs of games in the tied pairings, all of them at the same time.
+            # only the tied pairings play them, so each pairing keeps count of its own games
+            games_played = [self.games_per_pairing] * len(pairings)
+            tiebreaks = 0
+            tied = [i for i, score in enumerate(scores) if score * 2 == games_played[i]]
+            while tied and tiebreaks < self.max_tiebreaks:
+                extra = self.play_round(pool, [pairings[i] for i in tied], 2)
+                for i, score in zip(tied, extra):
+                    scores[i] += score
+                    games_played[i] += 2
+                tied = [i for i in tied if scores[i] * 2 == games_played[i]]
+                tiebreaks += 1
+
+            eliminated = []
+            for (player_a, player_b), score, games in zip(pairings, scores, games_played):
+                if score * 2 > games or (score * 2 == games and self.random.random() < 0.5):
+                    advancing.append(player_a)
+                    eliminated.append(player_b)
+                else:
+                    advancing.append(player_b)
+                    eliminated.append(player_a)
+            # players knocked out in the same round are ordered by their points
+            eliminated.sort(key=lambda player: self.points[player])
+            self.placements.extend(eliminated)
+            remaining = advancing
+        self.placements.extend(remaining)
+
+    def standings(self):
+        """
+        Returns a list of dicts, one per bot, in finishing order.
+        """
+        elo = {rating.name: rating for rating in elo_ratings(self.games)}
+        bayes, self.draw_elo = bayes_elo_ratings(self.games)
+        bayes = {rating.name: rating for rating in bayes}
+        for name in self.names:
+            # a bot which has only had byes hasn't played anyone to be rated against
+            unrated = Rating(name, 0.0, float('inf'), 0, 0.0)
+            elo.setdefault(name, unrated)
+            bayes.setdefault(name, unrated)
+
+        if self.format == KNOCKOUT:
+            order = list(reversed(self.placements))
+        else:
+            order = sorted(range(len(self.bots)), key=lambda player: (self.points[player], elo[self.names[player]].rating), reverse=True)
+
+        standings = []
+        for place, player in enumerate(order, 1):
+            name = self.names[player]
+            standings.append({
+                'place': place,
+                'name': name,
+                'points': self.points[player],
+                'games': elo[name].games,
+                'elo': elo[name].rating,
+                'elo_error': elo[name].error,
+                'bayes_elo': bayes[name].rating,
+                'bayes_elo_error': bayes[name].error
+            })
+        return standings
+
+def print_standings(standings):
+    print(f"{'#':>3} {'Name':<28} {'Points':>7} {'Games':>6} {'Elo':>14} {'BayesElo':>14}")
+    for row in standings:
+        elo = f"{row['elo']:+.0f} ±{row['elo_error']:.0f}"
+        bayes_elo = f"{row['bayes_elo']:+.0f} ±{row['bayes_elo_error']:.0f}"
+        print(f"{row['place']:>3} {row['name']:<28} {row['points']:>7.1f} {row['games']:>6} {elo:>14} {bayes_elo:>14}")
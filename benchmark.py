@@ -0,0 +1,195 @@
+"""
+Reproducible benchmarks for the bots and the match runner. Results are written to JSON so runs can be compared across commits.
+
+Example:
+    python benchmark.py --output bench.json
+    python benchmark.py --quick --bots RandomBot "AlphaBetaBot(4)" --workers 1 4 8
+
+Measures:
+    movegen     legal move generation and perft speed
+    evaluate    evaluations/sec of each bot's evaluate method (and the NumPy batch evaluator)
+    get_move    get_move latency percentiles and search nodes/sec on a fixed set of positions
+    games       games/sec of the match runner behind Interface.play_games at different worker counts
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import chess
+from Bots.search_board import SearchBoard
+from Runner.instrumentation import percentile
+from Runner.pool import iter_games, parse_bot_spec
+
+# fixed positions covering the opening, middlegame and endgame
+FENS = [
+    chess.STARTING_FEN,
+    'r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5Q2/PPPP1PPP/RNB1K1NR w KQkq - 2 3',
+    'r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP3PPP/R2QKB1R w KQ - 0 9',
+    'r2q1rk1/1b1nbppp/p2ppn2/1p6/3NP3/1BN1BP2/PPPQ2PP/2KR3R w - - 0 12',
+    '2r2rk1/pp1q1ppp/2n1pn2/3p4/3P4/2PBPN2/P2Q1PPP/R4RK1 b - - 3 15',
+    '8/5pk1/6p1/3R4/5P2/r5P1/6K1/8 w - - 0 45',
+    '8/8/4k3/8/2p5/2P1K3/8/8 w - - 0 60',
+    '6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1',
+]
+DEFAULT_BOTS = ['RandomBot', 'BasicEvalBot', 'nMoveBasicEvalBot(2)', 'AlphaBetaBot(3)', 'BatchEvalBot(1)', 'BatchEvalBot(2)']
+
+def timed_rate(function, items, min_time):
+    """
+    Calls function on every item, over and over until min_time seconds have passed. Returns calls per second.
+    """
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for item in items:
+            function(item)
+        calls += len(items)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls / elapsed
+
+def perft(board, depth):
+    if depth == 1:
+        return board.legal_moves.count()
+    nodes = 0
+    for move in board.legal_moves:
+        board.push(move)
+        nodes += perft(board, depth - 1)
+        board.pop()
+    return nodes
+
+def bench_movegen(min_time):
+    boards = [chess.Board(fen) for fen in FENS]
+    start = time.perf_counter()
+    nodes = perft(chess.Board(), 3)
+    elapsed = time.perf_counter() - start
+    return {
+        'legal_move_lists_per_sec': timed_rate(lambda board: list(board.legal_moves), boards, min_time),
+        'perft_3_nodes': nodes,
+        'perft_nodes_per_sec': nodes / elapsed
+    }
+
+def bench_evaluate(specs, min_time):
+    boards = [chess.Board(fen) for fen in FENS]
+    results = {}
+    for spec in specs:
+        bot = parse_bot_spec(spec, allow_gui=False)()
+        if hasattr(bot, 'evaluate'):
+            # the material bots evaluate the SearchBoards they search on
+            search_boards = [SearchBoard(board, bot.piece_values) for board in boards]
+            results[bot.name] = {'evaluations_per_sec': timed_rate(bot.evaluate, search_boards, min_time)}
+
+    try:
+        from Bots.batch_eval import BatchEvaluator
+    except ImportError: # NumPy isn't installed
+        return results
+    evaluator = BatchEvaluator()
+    batch = evaluator.pack(boards * 128)
+    rate = timed_rate(evaluator.evaluate, [batch], min_time)
+    results['BatchEvaluator'] = {'evaluations_per_sec': rate * len(batch), 'batch_size': len(batch)}
+    return results
+
+def bench_get_move(specs, repeats, seed):
+    results = {}
+    for spec in specs:
+        random.seed(seed)
+        factory = parse_bot_spec(spec, allow_gui=False)
+        latencies = []
+        nodes = 0
+        for _ in range(repeats):
+            for fen in FENS:
+                # a fresh bot for every call, otherwise repeats would mostly measure transposition table hits
+                bot = factory()
+                board = chess.Board(fen)
+                bot.side = board.turn
+                start = time.perf_counter()
+                bot.get_move(board)
+                latencies.append(time.perf_counter() - start)
+                nodes += getattr(bot, 'nodes', 0)
+
+        total = sum(latencies)
+        results[bot.name] = {
+            'calls': len(latencies),
+            'mean': total / len(latencies),
+            'p50': percentile(latencies, 0.5),
+            'p90': percentile(latencies, 0.9),
+            'p99': percentile(latencies, 0.99),
+            'max': max(latencies),
+            'stdev': statistics.pstdev(latencies),
+            'nodes_per_sec': nodes / total if nodes else None
+        }
+    return results
+
+def bench_games(bot1, bot2, games, worker_counts, seed):
+    results = {}
+    factory1, factory2 = parse_bot_spec(bot1, allow_gui=False), parse_bot_spec(bot2, allow_gui=False)
+    for workers in worker_counts:
+        for use_processes in (False, True):
+            start = time.perf_counter()
+            plies = sum(result.plies for result in iter_games(games, factory1, factory2, workers, use_processes, seed=seed))
+            elapsed = time.perf_counter() - start
+            key = f"{'processes' if use_processes else 'threads'}_{workers}"
+            results[key] = {'games': games, 'seconds': elapsed, 'games_per_sec': games / elapsed, 'plies_per_sec': plies / elapsed}
+    return results
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'time': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'python_chess': chess.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark move generation, evaluation, get_move latency and game throughput.')
+    parser.add_argument('--bots', nargs='+', default=DEFAULT_BOTS, help='bot specs to benchmark')
+    parser.add_argument('--repeats', type=int, default=3, help='how many times get_move is timed on each position')
+    parser.add_argument('--min-time', type=float, default=1.0, help='seconds each throughput measurement runs for at least')
+    parser.add_argument('--games', type=int, default=20, help='games played per worker count')
+    parser.add_argument('--game-bots', nargs=2, default=['RandomBot', 'BasicEvalBot'], help='the two bots used for the games benchmark')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='worker counts for the games benchmark')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='+', choices=['movegen', 'evaluate', 'get_move', 'games'], default=None, help='only run these benchmarks')
+    parser.add_argument('--quick', action='store_true', help='shorter run for a rough comparison')
+    parser.add_argument('-o', '--output', default='benchmark.json', help='JSON file to write the results to')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.quick:
+        args.repeats, args.min_time, args.games = 1, 0.2, 6
+    selected = args.only or ['movegen', 'evaluate', 'get_move', 'games']
+
+    report = {'environment': environment(), 'settings': vars(args)}
+    if 'movegen' in selected:
+        print('Benchmarking move generation...', file=sys.stderr)
+        report['movegen'] = bench_movegen(args.min_time)
+    if 'evaluate' in selected:
+        print('Benchmarking evaluate...', file=sys.stderr)
+        report['evaluate'] = bench_evaluate(args.bots, args.min_time)
+    if 'get_move' in selected:
+        print('Benchmarking get_move...', file=sys.stderr)
+        report['get_move'] = bench_get_move(args.bots, args.repeats, args.seed)
+    if 'games' in selected:
+        print('Benchmarking games...', file=sys.stderr)
+        report['games'] = bench_games(*args.game_bots, args.games, args.workers, args.seed)
+
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=4)
+    print(json.dumps({key: value for key, value in report.items() if key not in ('environment', 'settings')}, indent=4))
+
+if __name__ == '__main__':
+    main()
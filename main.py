@@ -1,10 +1,16 @@
-from Interface import Interface
-from Bots.bots import *
 
-bot1, bot2 = nMoveBasicEvalBot(2), BasicEvalBot()
+if __name__ == '__main__':
+    # imported under the guard so worker processes which re-import this file don't load PyQt or any bots
+    from Interface import Interface
+    from Bots.bots import RandomBot, BasicEvalBot, nMoveBasicEvalBot
+    from Runner.pool import BotFactory
 
-interface = Interface()
-interface.start_GUI()
+    bot1, bot2 = nMoveBasicEvalBot(2), BasicEvalBot()
 
-interface.play_games(100, bot1=RandomBot(), bot2=RandomBot())
+    interface = Interface()
+    interface.start_GUI()
 
+    interface.play_games(100, bot1=RandomBot(), bot2=RandomBot())
+
+    # CPU heavy bots should be played in worker processes so every core gets used
+    # interface.play_games(100, bot1=BotFactory(nMoveBasicEvalBot, 2), bot2=BasicEvalBot, use_processes=True)
@@ -0,0 +1,121 @@
+"""
+Headless command line runner for playing lots of games between two bots.
+Doesn't import PyQt at all, so it starts quickly and works on servers without a display.
+
+Example:
+    python simulate.py "nMoveBasicEvalBot(2)" BasicEvalBot --games 100 --workers 8 --seed 1 --output results.jsonl
+    python simulate.py "AlphaBetaBot(4)" "AlphaBetaBot(3)" --sprt 0 50 --games 2000 --move-time 0.1
+
+One JSON line is written per game as soon as it finishes, the totals are printed to stderr at the end.
+"""
+
+import argparse
+import inspect
+import json
+import sys
+from Runner.instrumentation import collect_profiles, print_profiles
+from Runner.openings import OpeningBook
+from Runner.pool import iter_games, parse_bot_spec
+from Runner.recording import BatchRecorder
+from Runner.results import MatchStats
+from Runner.termination import Adjudication
+from Runner.sprt import run_sprt
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Play games between two bots without the GUI.')
+    parser.add_argument('bot1', help="bot spec, e.g. RandomBot, 'nMoveBasicEvalBot(2)' or 'my_package.bots:MyBot'")
+    parser.add_argument('bot2', help='bot spec for the opponent')
+    parser.add_argument('-n', '--games', type=int, default=100, help='number of games to play (default 100)')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='number of worker processes (default: one per core)')
+    parser.add_argument('--threads', action='store_true', help='play games on threads instead of processes')
+    parser.add_argument('--seed', type=int, default=None, help='game i is played with seed + i')
+    parser.add_argument('--move-time', type=float, default=None, help='seconds per move')
+    parser.add_argument('--game-time', type=float, default=None, help='seconds per bot per game')
+    parser.add_argument('--sprt', type=float, nargs=2, metavar=('ELO0', 'ELO1'), default=None,
+                        help='stop as soon as an SPRT between these Elo bounds is decided, --games becomes the maximum')
+    parser.add_argument('--alpha', type=float, default=0.05, help='SPRT false positive rate (default 0.05)')
+    parser.add_argument('--beta', type=float, default=0.05, help='SPRT false negative rate (default 0.05)')
+    parser.add_argument('--openings', default=None, help='FEN/EPD file or polyglot book (.bin) of starting positions, each played with both colours')
+    parser.add_argument('--book', default=None, help='polyglot book both bots play from before searching')
+    parser.add_argument('-o', '--output', default='-', help='file to write the JSON lines to (default: stdout)')
+    parser.add_argument('--archive', default=None, help='also record the games to this game archive (see Runner.archive)')
+    parser.add_argument('--resign-material', type=float, default=None,
+                        help='adjudicate a loss for a side this many pawns behind for --resign-plies plies in a row')
+    parser.add_argument('--resign-plies', type=int, default=10, help='plies a side has to stay behind before it resigns (default 10)')
+    parser.add_argument('--max-plies', type=int, default=None, help='adjudicate games still going after this many plies as draws')
+    parser.add_argument('--shared-cache', type=float, default=None, metavar='MB',
+                        help='share search results between worker processes in a cache of this many megabytes (bots which support it, e.g. AlphaBetaBot)')
+    parser.add_argument('--instrument', action='store_true', help='print a latency histogram and search counters per bot at the end')
+    parser.add_argument('--profile', action='store_true', help='like --instrument, also runs every get_move call under cProfile')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        factory1, factory2 = parse_bot_spec(args.bot1, allow_gui=False), parse_bot_spec(args.bot2, allow_gui=False)
+    except ValueError as e:
+        sys.exit(str(e))
+    if args.book:
+        factory1.book = factory2.book = OpeningBook(args.book)
+    shared_cache = None
+    if args.shared_cache:
+        from Bots.shared_cache import SharedPositionCache
+        shared_cache = SharedPositionCache(int(args.shared_cache * 1024 * 1024))
+        # both bots can share one cache, entries are keyed on each bot's settings as well as the position
+        for factory in (factory1, factory2):
+            if 'shared_cache' in inspect.signature(factory.bot).parameters:
+                factory.kwargs['shared_cache'] = shared_cache
+    bot1_name, bot2_name = factory1().name, factory2().name
+    adjudication = None
+    if args.resign_material is not None or args.max_plies is not None:
+        adjudication = Adjudication(args.resign_material, args.resign_plies, args.max_plies)
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+    recorder = BatchRecorder(args.archive) if args.archive else None
+    stats = MatchStats(bot1_name, bot2_name)
+    profiles = {}
+    sprt = None
+
+    def game_finished(result):
+        stats.add(result)
+        if recorder is not None:
+            recorder.record(result)
+        collect_profiles(profiles, result)
+        record = result._asdict()
+        del record['bot1_profile'], record['bot2_profile']
+        record['game'] = stats.games
+        output.write(json.dumps(record) + '\n')
+        output.flush()
+
+    try:
+        if args.sprt:
+            sprt = run_sprt(factory1, factory2, args.sprt[0], args.sprt[1], args.alpha, args.beta, args.games, args.workers,
+                            not args.threads, args.move_time, args.game_time, args.seed, on_game=game_finished, openings=args.openings,
+                            instrument=args.instrument, profile=args.profile, adjudication=adjudication)
+        else:
+            results = iter_games(args.games, factory1, factory2, args.workers, not args.threads, args.move_time, args.game_time, args.seed,
+                                 args.openings, args.instrument, args.profile, adjudication)
+            for result in results:
+                game_finished(result)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if recorder is not None:
+            recorder.close()
+        if shared_cache is not None:
+            cache_stats = shared_cache.stats()
+            shared_cache.close()
+
+    print(f'{stats.games} games: {bot1_name} {stats.bot1_wins} wins, {bot2_name} {stats.bot2_wins} wins, {stats.draws} draws', file=sys.stderr)
+    print(f'Terminations: {dict(stats.terminations)}', file=sys.stderr)
+    if sprt is not None:
+        print(sprt.summary(), file=sys.stderr)
+    if shared_cache is not None:
+        print(f"Shared cache: {cache_stats['hits']}/{cache_stats['probes']} hits ({cache_stats['hit_rate']:.1%}), "
+              f"{cache_stats['usage']:.1%} of {cache_stats['memory'] / (1024 * 1024):.1f}MB used", file=sys.stderr)
+    if profiles:
+        print(file=sys.stderr)
+        print_profiles(profiles, file=sys.stderr)
+
+if __name__ == '__main__':
+    main()